@@ -6,6 +6,18 @@ import json
 import re
 import subprocess
 import threading
+import socket
+import socketserver
+import argparse
+import hmac
+import secrets
+import heapq
+import sqlite3
+import smtplib
+from email.message import EmailMessage
+import importlib.util
+from collections import OrderedDict, Counter, namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import webbrowser
@@ -19,64 +31,66 @@ import pyjokes
 import win32com.client
 import urllib.parse
 import pygetwindow as gw
+import numpy as np
 
 # ========== CONFIGURATION ==========
 class Config:
     NAME = "Alfred"
     VERSION = "Ultimate 4.0"
     
-    # Paths
-    APPS_PATH = {
-        'notepad': 'notepad.exe',
-        'calculator': 'calc.exe',
-        'browser': 'chrome.exe',
-        'explorer': 'explorer.exe',
-        'paint': 'mspaint.exe',
-        'cmd': 'cmd.exe',
-        'word': 'winword.exe',
-        'excel': 'excel.exe',
-        'powerpoint': 'powerpnt.exe',
-        'vscode': 'code.exe',
-        'spotify': 'spotify.exe',
-        'whatsapp': 'whatsapp://',
-        'telegram': 'tg://',
-        'vlc': 'vlc.exe',
-        'obs': 'obs64.exe',
-        'discord': 'discord://',
-        'steam': 'steam://',
-        'chrome': 'chrome.exe',
-        'edge': 'msedge.exe',
-        'firefox': 'firefox.exe',
-        'photoshop': 'photoshop.exe',
-        'premiere': 'Adobe Premiere Pro.exe',
-        'illustrator': 'illustrator.exe',
-    }
-    
-    # URLs
-    URLS = {
-        'youtube': 'https://www.youtube.com',
-        'google': 'https://www.google.com',
-        'gmail': 'https://mail.google.com',
-        'github': 'https://github.com',
-        'wikipedia': 'https://wikipedia.org',
-        'netflix': 'https://netflix.com',
-        'prime': 'https://primevideo.com',
-        'hotstar': 'https://hotstar.com',
-        'spotify web': 'https://open.spotify.com',
-        'chatgpt': 'https://chat.openai.com',
-        'gemini': 'https://gemini.google.com',
-        'drive': 'https://drive.google.com',
-        'maps': 'https://maps.google.com',
-        'facebook': 'https://facebook.com',
-        'instagram': 'https://instagram.com',
-        'twitter': 'https://twitter.com',
-        'linkedin': 'https://linkedin.com',
-        'reddit': 'https://reddit.com',
-    }
-    
     # File paths
     SCREENSHOTS_DIR = "screenshots"
     LOGS_DIR = "logs"
+    MACROS_FILE = "macros.json"
+    COMMANDS_FILE = "commands.json"
+    PLUGINS_DIR = "plugins"
+    
+    # Audio capture
+    AUDIO_BUFFER_SECONDS = 30
+    AUDIO_PREROLL = 0.4  # seconds kept from before speech starts
+    AUDIO_ENERGY_THRESHOLD = 300
+    AUDIO_PAUSE_THRESHOLD = 0.8  # seconds of silence that end a phrase
+    AUDIO_PHRASE_THRESHOLD = 0.3  # seconds of speech before it counts as a phrase, drops clicks
+    AUDIO_NON_SPEAKING = 0.5  # seconds of trailing silence kept after a phrase
+    
+    # Screenshots
+    SCREENSHOT_FORMAT = "png"  # png or webp
+    SCREENSHOT_PNG_COMPRESSION = 1  # 0-9, higher is smaller but slower
+    SCREENSHOT_WEBP_QUALITY = 80
+    SCREENSHOT_WORKERS = 2
+    SCREENSHOT_MAX_FILES = 200
+    SCREENSHOT_MAX_MB = 500
+    
+    # Pipeline
+    PIPELINE_WORKERS = 4
+    
+    # Outbound messages
+    OUTBOX_DB = "outbox.db"
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BASE = 2.0  # seconds, doubled after every failed attempt
+    OUTBOX_RETRY_MAX = 300
+    WHATSAPP_SEND_DELAY = 5  # seconds for WhatsApp Desktop to open the chat
+    SMTP_HOST = os.environ.get("SMTP_HOST", "")
+    SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
+    SMTP_USER = os.environ.get("SMTP_USER", "")
+    SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
+    SMTP_SENDER = os.environ.get("SMTP_SENDER", "")
+    SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") == "1"
+    
+    # Command server
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8765
+    SERVER_SESSION_TTL = 3600  # seconds idle before a session is dropped
+    SERVER_HISTORY = 50  # turns kept per session
+    SERVER_TOKEN_FILE = "server_token"  # shared secret every request must carry, made on first run
+    SERVER_UNSAFE_INTENTS = ('execute_command', 'create_file', 'read_file')  # refused unless --allow-unsafe
+    
+    # Intent cache
+    INTENT_CACHE_SIZE = 256
+    INTENT_CACHE_TTL = 600  # seconds
+    
+    # Duplicate command suppression
+    DEDUP_WINDOW = 4.0  # seconds, commands marked "repeatable" in the registry are exempt
 
 # ========== UTILITY FUNCTIONS ==========
 class Utils:
@@ -98,6 +112,16 @@ class Utils:
         """Get current timestamp"""
         return datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    @staticmethod
+    def parse_duration(text: str) -> int:
+        """Parse '30 seconds', 'a minute', '2 minutes' into seconds"""
+        match = re.match(r'(\d+|a|an|one)\s*(second|sec|minute|min|hour)', text.strip().lower())
+        if not match:
+            return 0
+        amount = 1 if match.group(1) in ('a', 'an', 'one') else int(match.group(1))
+        unit = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600}[match.group(2)]
+        return amount * unit
+    
     @staticmethod
     def run_command(command: str, wait: bool = True) -> bool:
         """Run system command"""
@@ -150,11 +174,157 @@ class SpeechEngine:
         
         return False
 
+# ========== AUDIO CAPTURE ==========
+class AudioRingBuffer:
+    """Preallocated 16-bit PCM ring. Every sample is stored twice, so any
+    window up to capacity is one contiguous slice and never needs copying."""
+    def __init__(self, seconds: float, sample_rate: int):
+        self.capacity = int(seconds * sample_rate)
+        self.sample_rate = sample_rate
+        self._data = np.zeros(self.capacity * 2, dtype=np.int16)
+        self.written = 0  # total samples written since creation
+
+    def write(self, samples: np.ndarray) -> int:
+        """Append int16 samples, returns the new write position"""
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        n = len(samples)
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        data, capacity = self._data, self.capacity
+        if first == n:
+            data[start:start + n] = samples
+            data[capacity + start:capacity + start + n] = samples
+        else:
+            for offset in (0, capacity):
+                data[offset + start:offset + start + first] = samples[:first]
+                data[offset:offset + n - first] = samples[first:]
+        self.written += n
+        return self.written
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Samples between two write positions, as a view into the ring"""
+        if start < self.written - self.capacity or end > self.written or start > end:
+            raise ValueError(f"Samples {start}-{end} are not in the buffer")
+        offset = start % self.capacity
+        return self._data[offset:offset + end - start]
+
+
+class Utterance:
+    """A phrase inside the ring buffer. Valid until the ring wraps over it."""
+    def __init__(self, samples: np.ndarray, sample_rate: int, speech_offset: int = 0):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.speech_offset = speech_offset  # samples of pre-roll before speech
+
+    @property
+    def data(self) -> memoryview:
+        """Raw little-endian PCM bytes, without copying"""
+        return memoryview(self.samples).cast('B')
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def to_audio_data(self) -> sr.AudioData:
+        return sr.AudioData(self.data, self.sample_rate, 2)
+
+
+class RingBufferCapture:
+    def __init__(self, sample_rate: int = 16000, chunk: int = 1024,
+                 buffer_seconds: float = Config.AUDIO_BUFFER_SECONDS,
+                 preroll: float = Config.AUDIO_PREROLL,
+                 energy_threshold: float = Config.AUDIO_ENERGY_THRESHOLD,
+                 dynamic_energy: bool = True,
+                 pause_threshold: float = Config.AUDIO_PAUSE_THRESHOLD,
+                 phrase_threshold: float = Config.AUDIO_PHRASE_THRESHOLD,
+                 non_speaking: float = Config.AUDIO_NON_SPEAKING):
+        self.ring = AudioRingBuffer(buffer_seconds, sample_rate)
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.preroll = int(preroll * sample_rate)
+        self.energy_threshold = energy_threshold
+        self.dynamic_energy = dynamic_energy
+        self.pause_threshold = pause_threshold
+        self.phrase_threshold = int(phrase_threshold * sample_rate)
+        self.non_speaking = int(non_speaking * sample_rate)
+        self.listeners = []  # called with each Utterance (wake word, recording, ...)
+
+    @staticmethod
+    def energy(samples: np.ndarray) -> float:
+        """RMS energy of 16-bit samples"""
+        if not len(samples):
+            return 0.0
+        x = samples.astype(np.float32)
+        return float(np.sqrt(np.dot(x, x) / len(x)))
+
+    def _adjust_threshold(self, energy: float):
+        # Same ambient tracking as speech_recognition's dynamic threshold
+        damping = 0.15 ** (self.chunk / self.sample_rate)
+        target = energy * 1.5
+        self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+
+    def listen(self, stream, timeout: float = None, phrase_time_limit: float = None) -> Utterance:
+        """Read chunks from stream until a phrase ends, returns it as an Utterance"""
+        chunk_seconds = self.chunk / self.sample_rate
+        waited = 0.0
+        speech_start = None
+        speech_end = None  # write position after the last loud chunk
+        silence = 0.0
+
+        while True:
+            frame = stream.read(self.chunk)
+            if not frame:
+                if speech_start is None or speech_end - speech_start < self.phrase_threshold:
+                    raise sr.WaitTimeoutError("audio stream ended before a phrase started")
+                break
+            samples = np.frombuffer(frame, dtype=np.int16)
+            end = self.ring.write(samples)
+            energy = self.energy(samples)
+            loud = energy > self.energy_threshold
+
+            if speech_start is None:
+                if loud:
+                    speech_start, speech_end, silence = end - len(samples), end, 0.0
+                    continue
+                if self.dynamic_energy:
+                    self._adjust_threshold(energy)
+                waited += chunk_seconds
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+
+            if loud:
+                speech_end, silence = end, 0.0
+            else:
+                silence += chunk_seconds
+            if silence >= self.pause_threshold:
+                # Too short to be speech (a click or a knock), keep waiting
+                if speech_end - speech_start < self.phrase_threshold:
+                    waited += (end - speech_start) / self.sample_rate
+                    speech_start = None
+                    if timeout and waited > timeout:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                    continue
+                break
+            if phrase_time_limit and (end - speech_start) / self.sample_rate >= phrase_time_limit:
+                break
+
+        start = max(speech_start - self.preroll, end - self.ring.capacity, 0)
+        end = min(end, speech_end + self.non_speaking)
+        utterance = Utterance(self.ring.view(start, end), self.sample_rate, speech_start - start)
+        for listener in self.listeners:
+            listener(utterance)
+        return utterance
+
 # ========== VOICE RECOGNITION ==========
 class VoiceRecognition:
-    def __init__(self):
+    def __init__(self, rescorer=None):
         self.recognizer = sr.Recognizer()
         self.microphone = None
+        self.capture = None
+        self.rescorer = rescorer
     
     def listen(self) -> str:
         """Listen for voice input - IMPROVED VERSION"""
@@ -163,22 +333,31 @@ class VoiceRecognition:
                 self.microphone = sr.Microphone()
             
             with self.microphone as source:
-                # Reduce ambient noise sensitivity
-                self.recognizer.energy_threshold = 300
-                self.recognizer.dynamic_energy_threshold = True
+                # Phrases are cut straight out of a preallocated ring buffer
+                if self.capture is None:
+                    self.capture = RingBufferCapture(source.SAMPLE_RATE, source.CHUNK)
                 
                 print("\n🎤 Listening... (Speak clearly)")
                 
                 # Listen with better parameters
-                audio = self.recognizer.listen(
-                    source, 
+                utterance = self.capture.listen(
+                    source.stream,
                     timeout=3,
                     phrase_time_limit=5
                 )
+                audio = utterance.to_audio_data()
+                
+                # Use Google Speech Recognition, asking for every alternative
+                result = self.recognizer.recognize_google(audio, language="en-IN", show_all=True)
+                alternatives = result.get('alternative', []) if isinstance(result, dict) else []
+                if not alternatives:
+                    raise sr.UnknownValueError()
                 
-                # Use Google Speech Recognition
-                text = self.recognizer.recognize_google(audio, language="en-IN")
+                top = alternatives[0]['transcript']
+                text = self.rescorer.best(alternatives) if self.rescorer else top
                 print(f"👤 You said: {text}")
+                if text.lower() != top.lower():
+                    print(f"   (heard '{top}', picked a hypothesis that matches a command)")
                 return text.lower()
                 
         except sr.UnknownValueError:
@@ -200,32 +379,489 @@ class VoiceRecognition:
             time.sleep(0.5)
         return ""
 
+# ========== SCREEN CAPTURE ==========
+class ScreenCapture:
+    def __init__(self, directory: str = Config.SCREENSHOTS_DIR,
+                 image_format: str = Config.SCREENSHOT_FORMAT, grab=None):
+        self.directory = Path(directory)
+        self.format = image_format.lower()
+        self.grab = grab or (lambda region=None: pyautogui.screenshot(region=region))
+        self.encoder = ThreadPoolExecutor(max_workers=Config.SCREENSHOT_WORKERS)
+        self._retention_lock = threading.Lock()
+        self._burst_stop = None
+
+    def _new_path(self) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        return self.directory / f"screenshot_{stamp}.{self.format}"
+
+    def capture(self, region=None):
+        """Grab a frame now and encode it in the background, returns (path, future)"""
+        frame = self.grab(region=region)
+        path = self._new_path()
+        return path, self.encoder.submit(self._encode, frame, path)
+
+    def _encode(self, frame, path: Path):
+        try:
+            if self.format == 'webp':
+                frame.save(path, format='WEBP', quality=Config.SCREENSHOT_WEBP_QUALITY)
+            else:
+                frame.save(path, format='PNG', compress_level=Config.SCREENSHOT_PNG_COMPRESSION)
+            self.enforce_retention()
+        except Exception as e:
+            Utils.log(f"Screenshot encode failed: {e}", "ERROR")
+            raise
+
+    def active_window_region(self):
+        """Region of the focused window as (left, top, width, height)"""
+        window = gw.getActiveWindow()
+        if window is None or window.width <= 0 or window.height <= 0:
+            return None
+        left, top = max(window.left, 0), max(window.top, 0)
+        return (left, top, window.width - (left - window.left), window.height - (top - window.top))
+
+    def start_burst(self, interval: int, duration: int):
+        """Capture every interval seconds until duration runs out or stop_burst()"""
+        self.stop_burst()
+        stop = threading.Event()
+
+        def run():
+            end = time.monotonic() + duration
+            while not stop.is_set() and time.monotonic() < end:
+                try:
+                    self.capture()
+                except Exception as e:
+                    Utils.log(f"Burst capture failed: {e}", "ERROR")
+                    break
+                stop.wait(interval)
+
+        self._burst_stop = stop
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop_burst(self) -> bool:
+        if self._burst_stop is None or self._burst_stop.is_set():
+            return False
+        self._burst_stop.set()
+        return True
+
+    def enforce_retention(self):
+        """Delete the oldest screenshots beyond the file count and size limits"""
+        with self._retention_lock:
+            files = sorted(self.directory.glob("screenshot_*"), key=lambda f: f.stat().st_mtime)
+            total = sum(f.stat().st_size for f in files)
+            max_bytes = Config.SCREENSHOT_MAX_MB * 1024 * 1024
+            while files and (len(files) > Config.SCREENSHOT_MAX_FILES or total > max_bytes):
+                oldest = files.pop(0)
+                total -= oldest.stat().st_size
+                oldest.unlink(missing_ok=True)
+
+# ========== COMMAND REGISTRY ==========
+CommandEntry = namedtuple('CommandEntry', ['order', 'regex', 'intent', 'args', 'focus', 'repeatable'])
+
+class CommandRegistry:
+    # Patterns starting with a plain word followed by a space are indexed by that word,
+    # unless a top-level '|' lets them start with something else
+    LEADING_WORD = re.compile(r'([a-z0-9]+) ')
+
+    def __init__(self, path: str = Config.COMMANDS_FILE, plugins_dir: str = Config.PLUGINS_DIR,
+                 automation=None):
+        self.path = Path(path)
+        self.plugins_dir = Path(plugins_dir)
+        self.automation = automation or AutomationEngine
+        self.plugin_commands = []  # command dicts registered by plugins
+        self.plugin_handlers = {}
+        self.version = 0
+        self._mtime = None
+        self._data = {}
+
+        self.apps = {}
+        self.urls = {}
+        self.processes = {}
+        self.youtube_keys = {}
+        self.handlers = {}
+        self.index = {}
+        self.wildcard = []
+        self.size = 0
+
+        self.reload()
+        self.load_plugins()
+
+    def reload(self) -> bool:
+        """Load the registry file and recompile, keeping the old tables on error"""
+        try:
+            self._mtime = self.path.stat().st_mtime
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._compile(data)
+            self._data = data
+            Utils.log(f"Loaded {self.size} command patterns from {self.path}")
+            return True
+        except Exception as e:
+            Utils.log(f"Command registry load failed: {e}", "ERROR")
+            return False
+
+    def reload_if_changed(self) -> bool:
+        """Hot-reload when the registry file has been edited"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.reload()
+
+    def load_plugins(self):
+        """Import plugins/*.py and let each register(registry) add intents"""
+        if not self.plugins_dir.is_dir():
+            return
+        for plugin in sorted(self.plugins_dir.glob("*.py")):
+            try:
+                spec = importlib.util.spec_from_file_location(f"alfred_plugin_{plugin.stem}", plugin)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                module.register(self)
+                Utils.log(f"Plugin loaded: {plugin.stem}")
+            except Exception as e:
+                Utils.log(f"Plugin {plugin.stem} failed: {e}", "ERROR")
+
+    def register_intent(self, intent: str, handler, patterns: list, args: dict = None,
+                        focus: bool = False, repeatable: bool = False):
+        """Add a new intent from code, patterns use named groups for handler kwargs.
+        focus marks intents that drive the keyboard or change window focus,
+        repeatable ones may run again straight away without being taken for an echo."""
+        # A bad pattern raises here, before it can break every later reload()
+        for pattern in patterns:
+            re.compile(pattern, re.IGNORECASE)
+        self.plugin_handlers[intent] = handler
+        self.plugin_commands.append({'intent': intent, 'patterns': patterns, 'args': args or {},
+                                     'focus': focus, 'repeatable': repeatable})
+        self._compile(self._data)
+
+    def _handler(self, intent: str):
+        if intent in self.plugin_handlers:
+            return self.plugin_handlers[intent]
+        return getattr(self.automation, intent, None)
+
+    @staticmethod
+    def _has_top_level_alternation(pattern: str) -> bool:
+        """Whether a '|' outside any group or class lets the pattern start with another word"""
+        depth, in_class, escaped = 0, False, False
+        for char in pattern:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif in_class:
+                in_class = char != ']'
+            elif char == '[':
+                in_class = True
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == '|' and depth == 0:
+                return True
+        return False
+
+    def _compile(self, data: dict):
+        handlers, index, wildcard = {}, {}, []
+        order = 0
+        for command in data.get('commands', []) + self.plugin_commands:
+            intent = command['intent']
+            handler = self._handler(intent)
+            if handler is None:
+                Utils.log(f"Unknown intent in command registry: {intent}", "WARNING")
+                continue
+            handlers[intent] = handler
+            for pattern in command['patterns']:
+                entry = CommandEntry(order, re.compile(pattern, re.IGNORECASE),
+                                     intent, command.get('args', {}), command.get('focus', False),
+                                     command.get('repeatable', False))
+                order += 1
+                word = self.LEADING_WORD.match(pattern)
+                if word and not self._has_top_level_alternation(pattern):
+                    index.setdefault(word.group(1), []).append(entry)
+                else:
+                    wildcard.append(entry)
+
+        self.apps = data.get('apps', {})
+        self.urls = data.get('urls', {})
+        self.processes = data.get('processes', {})
+        self.youtube_keys = data.get('youtube_keys', {})
+        self.handlers, self.index, self.wildcard, self.size = handlers, index, wildcard, order
+        self.version += 1
+
+    def match(self, text: str):
+        """Find the first entry matching the text, returns (entry, match)"""
+        words = text.split(None, 1)
+        indexed = self.index.get(words[0].lower()) if words else None
+        candidates = heapq.merge(indexed, self.wildcard) if indexed else self.wildcard
+        for entry in candidates:
+            match = entry.regex.match(text)
+            if match:
+                return entry, match
+        return None, None
+
+    def resolve_app(self, name: str):
+        """Find an app or URL by name, returns (key, target) or (None, None)"""
+        name = name.lower().strip()
+        for table in (self.apps, self.urls):
+            if name in table:
+                return name, table[name]
+        for table in (self.apps, self.urls):
+            for key, target in table.items():
+                if key in name:
+                    return key, target
+        return None, None
+
+    def resolve_process(self, name: str):
+        """Find the process image for an app name, returns (key, process) or (None, None)"""
+        name = name.lower().strip()
+        if name in self.processes:
+            return name, self.processes[name]
+        for key, process in self.processes.items():
+            if key in name:
+                return key, process
+        return None, None
+
+# ========== OUTBOUND MESSAGES ==========
+class MessageQueue:
+    """Persistent outbox, one row per message"""
+    def __init__(self, path: str = Config.OUTBOX_DB):
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self._lock, self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    recipient TEXT NOT NULL,
+                    subject TEXT,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    error TEXT
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS due ON messages (channel, status, next_attempt)")
+            # Sends interrupted by a crash or restart go out again
+            self.db.execute("UPDATE messages SET status = 'queued' WHERE status = 'sending'")
+
+    def enqueue(self, channel: str, recipient: str, body: str, subject: str = None) -> int:
+        now = time.time()
+        with self._lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO messages (channel, recipient, subject, body, next_attempt, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (channel, recipient, subject, body, now, now, now))
+            return cursor.lastrowid
+
+    def claim_batch(self, channel: str) -> list:
+        """Take the oldest due message plus everything else due for the same recipient"""
+        now = time.time()
+        with self._lock, self.db:
+            first = self.db.execute(
+                "SELECT recipient, subject FROM messages WHERE channel = ? AND status = 'queued' "
+                "AND next_attempt <= ? ORDER BY id LIMIT 1", (channel, now)).fetchone()
+            if first is None:
+                return []
+            rows = self.db.execute(
+                "SELECT * FROM messages WHERE channel = ? AND status = 'queued' AND next_attempt <= ? "
+                "AND recipient = ? AND subject IS ? ORDER BY id",
+                (channel, now, first['recipient'], first['subject'])).fetchall()
+            self.db.executemany("UPDATE messages SET status = 'sending', updated = ? WHERE id = ?",
+                                [(now, row['id']) for row in rows])
+            return rows
+
+    def mark_sent(self, ids: list, status: str = 'sent'):
+        now = time.time()
+        with self._lock, self.db:
+            self.db.executemany("UPDATE messages SET status = ?, error = NULL, updated = ? WHERE id = ?",
+                                [(status, now, i) for i in ids])
+
+    def mark_failed(self, rows: list, error: str):
+        """Reschedule with exponential backoff, or give up after the last attempt"""
+        now = time.time()
+        with self._lock, self.db:
+            for row in rows:
+                attempts = row['attempts'] + 1
+                if attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                    status, next_attempt = 'failed', now
+                else:
+                    status = 'queued'
+                    next_attempt = now + min(Config.OUTBOX_RETRY_BASE * 2 ** (attempts - 1), Config.OUTBOX_RETRY_MAX)
+                self.db.execute(
+                    "UPDATE messages SET status = ?, attempts = ?, next_attempt = ?, error = ?, updated = ? "
+                    "WHERE id = ?", (status, attempts, next_attempt, error, now, row['id']))
+
+    def next_due(self, channel: str):
+        """Time of the next queued message, or None"""
+        with self._lock:
+            row = self.db.execute("SELECT MIN(next_attempt) FROM messages WHERE channel = ? AND status = 'queued'",
+                                  (channel,)).fetchone()
+        return row[0]
+
+    def latest(self, recipient: str = None, limit: int = 5) -> list:
+        """Most recent messages, optionally to one recipient"""
+        with self._lock:
+            if recipient:
+                return self.db.execute(
+                    "SELECT * FROM messages WHERE recipient LIKE ? ORDER BY id DESC LIMIT ?",
+                    (f"%{recipient}%", limit)).fetchall()
+            return self.db.execute("SELECT * FROM messages ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+
+class WhatsAppBackend:
+    done_status = 'sent'
+
+    def send(self, recipient: str, subject: str, body: str):
+        url = f"whatsapp://send?phone={recipient}&text={urllib.parse.quote(body)}"
+        # Holds focus for the whole send so voice commands can't steal the Enter
+        with AutomationEngine.focus_lock:
+            if not webbrowser.open(url):
+                raise RuntimeError("WhatsApp could not be opened")
+            time.sleep(Config.WHATSAPP_SEND_DELAY)
+            window = gw.getActiveWindow()
+            if window is None or 'whatsapp' not in (window.title or '').lower():
+                raise RuntimeError("WhatsApp window did not come to the front")
+            pyautogui.press('enter')
+
+
+class SmtpBackend:
+    done_status = 'sent'
+
+    def __init__(self, host: str = Config.SMTP_HOST, port: int = Config.SMTP_PORT,
+                 user: str = Config.SMTP_USER, password: str = Config.SMTP_PASSWORD,
+                 sender: str = Config.SMTP_SENDER, starttls: bool = Config.SMTP_STARTTLS):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.sender = sender or user
+        self.starttls = starttls
+
+    def send(self, recipient: str, subject: str, body: str):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = recipient
+        message['Subject'] = subject or f"Message from {Config.NAME}"
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+            smtp.send_message(message)
+
+
+class MailtoBackend:
+    """Hands the email to the default mail client when no SMTP server is configured"""
+    done_status = 'handed_off'  # the user still has to press send in the mail client
+
+    def send(self, recipient: str, subject: str, body: str):
+        url = f"mailto:{recipient}?subject={urllib.parse.quote(subject or '')}&body={urllib.parse.quote(body)}"
+        if not webbrowser.open(url):
+            raise RuntimeError("No mail client available")
+
+
+class OutboundWorker:
+    """Sends one channel's messages one batch at a time"""
+    def __init__(self, queue: MessageQueue, channel: str, backend):
+        self.queue = queue
+        self.channel = channel
+        self.backend = backend
+        self.wakeup = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"outbox-{channel}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            rows = self.queue.claim_batch(self.channel)
+            if not rows:
+                due = self.queue.next_due(self.channel)
+                timeout = 5.0 if due is None else min(max(due - time.time(), 0.05), 5.0)
+                self.wakeup.wait(timeout)
+                self.wakeup.clear()
+                continue
+            body = "\n".join(row['body'] for row in rows)
+            try:
+                self.backend.send(rows[0]['recipient'], rows[0]['subject'], body)
+                self.queue.mark_sent([row['id'] for row in rows], getattr(self.backend, 'done_status', 'sent'))
+                Utils.log(f"{self.channel} sent to {rows[0]['recipient']} ({len(rows)} message(s))")
+            except Exception as e:
+                self.queue.mark_failed(rows, str(e))
+                Utils.log(f"{self.channel} to {rows[0]['recipient']} failed: {e}", "WARNING")
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+
+class Outbox:
+    def __init__(self, queue: MessageQueue = None, backends: dict = None):
+        self.queue = queue or MessageQueue()
+        if backends is None:
+            backends = {
+                'whatsapp': WhatsAppBackend(),
+                'email': SmtpBackend() if Config.SMTP_HOST else MailtoBackend(),
+            }
+        self.workers = {channel: OutboundWorker(self.queue, channel, backend)
+                        for channel, backend in backends.items()}
+
+    def send(self, channel: str, recipient: str, body: str, subject: str = None) -> int:
+        message_id = self.queue.enqueue(channel, recipient, body, subject)
+        self.workers[channel].wakeup.set()
+        return message_id
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
+
 # ========== AUTOMATION ENGINE ==========
 class AutomationEngine:
+    capture = None
+    registry = None
+    outbox = None
+    focus_lock = threading.Lock()  # one keyboard/focus driven action at a time
+
+    @staticmethod
+    def message_outbox() -> Outbox:
+        """Shared outbound message queue, workers start on first use"""
+        if AutomationEngine.outbox is None:
+            AutomationEngine.outbox = Outbox()
+        return AutomationEngine.outbox
+
+    @staticmethod
+    def command_registry() -> CommandRegistry:
+        """Shared command registry, loaded on first use"""
+        if AutomationEngine.registry is None:
+            AutomationEngine.registry = CommandRegistry()
+        return AutomationEngine.registry
+
+    @staticmethod
+    def screen_capture() -> ScreenCapture:
+        """Shared capture subsystem, created on first use"""
+        if AutomationEngine.capture is None:
+            AutomationEngine.capture = ScreenCapture()
+        return AutomationEngine.capture
+
     @staticmethod
     def open_application(app_name: str) -> str:
         """Open any application"""
-        app_lower = app_name.lower()
-        
-        # Check in apps
-        for key, path in Config.APPS_PATH.items():
-            if key in app_lower:
-                try:
-                    if '://' in path:  # URL scheme
-                        webbrowser.open(path)
-                    elif os.path.exists(path):
-                        os.startfile(path)
-                    else:
-                        os.system(f'start {path}')
-                    return f"Opening {key}..."
-                except Exception as e:
-                    return f"Failed to open {key}"
+        key, target = AutomationEngine.command_registry().resolve_app(app_name)
         
-        # Check in URLs
-        for key, url in Config.URLS.items():
-            if key in app_lower:
-                webbrowser.open(url)
+        if key:
+            try:
+                if '://' in target:  # URL or URL scheme
+                    webbrowser.open(target)
+                elif os.path.exists(target):
+                    os.startfile(target)
+                else:
+                    os.system(f'start {target}')
                 return f"Opening {key}..."
+            except Exception as e:
+                return f"Failed to open {key}"
         
         # Try direct
         try:
@@ -237,31 +873,14 @@ class AutomationEngine:
     @staticmethod
     def close_application(app_name: str) -> str:
         """Close application"""
-        app_lower = app_name.lower()
-        
-        process_map = {
-            'chrome': 'chrome.exe',
-            'browser': 'chrome.exe',
-            'notepad': 'notepad.exe',
-            'calculator': 'calc.exe',
-            'explorer': 'explorer.exe',
-            'word': 'winword.exe',
-            'excel': 'excel.exe',
-            'powerpoint': 'powerpnt.exe',
-            'spotify': 'spotify.exe',
-            'vlc': 'vlc.exe',
-            'steam': 'steam.exe',
-            'discord': 'discord.exe',
-            'obs': 'obs64.exe'
-        }
+        key, process = AutomationEngine.command_registry().resolve_process(app_name)
         
-        for key, process in process_map.items():
-            if key in app_lower:
-                try:
-                    os.system(f'taskkill /f /im {process} 2>nul')
-                    return f"Closing {key}..."
-                except:
-                    return f"Failed to close {key}"
+        if key:
+            try:
+                os.system(f'taskkill /f /im {process} 2>nul')
+                return f"Closing {key}..."
+            except:
+                return f"Failed to close {key}"
         
         return f"Don't know how to close {app_name}"
 
@@ -272,31 +891,20 @@ class AutomationEngine:
             search_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(query)}"
             webbrowser.open(search_url)
             
-            # Auto-play first result after delay
-            def auto_play():
-                time.sleep(4)
-                pyautogui.press('tab', presses=3)
-                time.sleep(0.5)
-                pyautogui.press('enter')
-            
-            threading.Thread(target=auto_play, daemon=True).start()
-            return f"Searching YouTube for {query} and playing first result..."
+            # Auto-play first result once the page has loaded. Runs inline, under the
+            # focus_lock held by process_single, so no other keystrokes land in between
+            time.sleep(4)
+            pyautogui.press('tab', presses=3)
+            time.sleep(0.5)
+            pyautogui.press('enter')
+            return f"Playing the first YouTube result for {query}"
         except Exception as e:
             return f"Failed: {str(e)}"
 
     @staticmethod
     def youtube_control(action: str) -> str:
         """Control YouTube playback"""
-        actions = {
-            'play': 'k',
-            'pause': 'k',
-            'next': 'shift+n',
-            'previous': 'shift+p',
-            'fullscreen': 'f',
-            'mute': 'm',
-            'skip forward': 'l',
-            'skip backward': 'j'
-        }
+        actions = AutomationEngine.command_registry().youtube_keys
         
         if action in actions:
             pyautogui.press(actions[action])
@@ -304,16 +912,48 @@ class AutomationEngine:
         return f"Unknown action: {action}"
 
     @staticmethod
-    def take_screenshot() -> str:
+    def take_screenshot(region=None) -> str:
         """Take screenshot"""
         try:
-            filename = f"screenshot_{Utils.get_timestamp()}.png"
-            path = Path(Config.SCREENSHOTS_DIR) / filename
-            pyautogui.screenshot().save(path)
-            return f"Screenshot saved: {filename}"
+            # Encoding finishes in the background, failures are logged by ScreenCapture
+            path, _ = AutomationEngine.screen_capture().capture(region)
+            return f"Saving screenshot: {path.name}"
+        except Exception as e:
+            return f"Failed: {str(e)}"
+
+    @staticmethod
+    def screenshot_window() -> str:
+        """Take screenshot of the active window"""
+        try:
+            region = AutomationEngine.screen_capture().active_window_region()
+            if region is None:
+                return "No active window to capture"
+            return AutomationEngine.take_screenshot(region)
         except Exception as e:
             return f"Failed: {str(e)}"
 
+    @staticmethod
+    def screenshot_region(left: int, top: int, width: int, height: int) -> str:
+        """Take screenshot of a screen region"""
+        return AutomationEngine.take_screenshot((int(left), int(top), int(width), int(height)))
+
+    @staticmethod
+    def screenshot_burst(interval: int, duration_text: str = None) -> str:
+        """Take screenshots at an interval"""
+        interval = int(interval)
+        duration = Utils.parse_duration(duration_text or "a minute") or 60
+        if interval <= 0:
+            return "Interval must be at least one second"
+        AutomationEngine.screen_capture().start_burst(interval, duration)
+        return f"Taking a screenshot every {interval} seconds for {duration} seconds"
+
+    @staticmethod
+    def stop_screenshot_burst() -> str:
+        """Stop interval screenshots"""
+        if AutomationEngine.screen_capture().stop_burst():
+            return "Stopped taking screenshots"
+        return "No screenshots running"
+
     @staticmethod
     def send_whatsapp(phone: str, message: str = "Hello from Alfred!") -> str:
         """Send WhatsApp message"""
@@ -322,15 +962,7 @@ class AutomationEngine:
             if len(phone_clean) < 10:
                 return "Invalid phone number"
             
-            url = f"whatsapp://send?phone={phone_clean}&text={urllib.parse.quote(message)}"
-            webbrowser.open(url)
-            
-            # Auto-send after delay
-            def auto_send():
-                time.sleep(5)
-                pyautogui.press('enter')
-            
-            threading.Thread(target=auto_send, daemon=True).start()
+            AutomationEngine.message_outbox().send('whatsapp', phone_clean, message)
             return f"Sending WhatsApp to {phone}: {message}"
         except Exception as e:
             return f"Failed: {str(e)}"
@@ -339,9 +971,38 @@ class AutomationEngine:
     def send_email(to: str, subject: str, body: str) -> str:
         """Send email"""
         try:
-            url = f"mailto:{to}?subject={urllib.parse.quote(subject)}&body={urllib.parse.quote(body)}"
-            webbrowser.open(url)
-            return f"Preparing email to {to}: {subject}"
+            AutomationEngine.message_outbox().send('email', to.strip(), body, subject)
+            return f"Sending email to {to}: {subject}"
+        except Exception as e:
+            return f"Failed: {str(e)}"
+
+    @staticmethod
+    def message_status(recipient: str = None) -> str:
+        """Report delivery state of recent messages"""
+        try:
+            if recipient:
+                recipient = recipient.strip()
+                # Phone numbers are stored as digits only, email addresses as given
+                if re.fullmatch(r'[\d\s()+-]+', recipient):
+                    recipient = re.sub(r'\D', '', recipient)
+            rows = AutomationEngine.message_outbox().queue.latest(recipient, limit=3)
+            if not rows:
+                return f"No messages to {recipient}" if recipient else "No messages sent yet"
+            replies = []
+            for row in rows:
+                reply = f"Your {row['channel']} to {row['recipient']}"
+                if row['status'] == 'sent':
+                    reply += " went out."
+                elif row['status'] == 'handed_off':
+                    reply += " is open in your mail client, it goes out once you send it there."
+                elif row['status'] == 'failed':
+                    reply += f" failed after {row['attempts']} attempts: {row['error']}."
+                elif row['attempts']:
+                    reply += f" is being retried after {row['attempts']} failed attempts."
+                else:
+                    reply += " is waiting to be sent."
+                replies.append(reply)
+            return " ".join(replies)
         except Exception as e:
             return f"Failed: {str(e)}"
 
@@ -420,6 +1081,8 @@ class AutomationEngine:
     @staticmethod
     def set_reminder(text: str, minutes: int = 5) -> str:
         """Set reminder"""
+        minutes = int(minutes)
+        
         def reminder():
             time.sleep(minutes * 60)
             notification.notify(
@@ -449,119 +1112,533 @@ class AutomationEngine:
         except:
             return f"Failed to press {key}"
 
+# ========== INTENT CACHE ==========
+# A resolved utterance: one intent, or the stages of a multi-step plan
+CachedIntent = namedtuple('CachedIntent', ['intent', 'focus', 'stages', 'repeatable'])
+
+class IntentCache:
+    def __init__(self, max_size: int = Config.INTENT_CACHE_SIZE,
+                 ttl: float = Config.INTENT_CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (stored_at, intent)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize utterance text into a cache key"""
+        # Arguments are cached with the intent, so only whitespace is folded
+        return ' '.join(text.split())
+
+    def get(self, key: str):
+        """Return cached intent or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, intent = entry
+            if self.ttl and self.clock() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return intent
+
+    def put(self, key: str, intent):
+        """Store a resolved intent, evicting the least recently used"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock(), intent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, key: str):
+        """Cached intent or None, without touching stats or recency"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or (self.ttl and self.clock() - entry[0] > self.ttl):
+            return None
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hit_rate, 3),
+        }
+
+# ========== DUPLICATE SUPPRESSION ==========
+class CommandDebouncer:
+    def __init__(self, repeatable, window: float = Config.DEDUP_WINDOW, clock=time.monotonic):
+        self.repeatable = repeatable  # command -> whether running it twice is harmless
+        self.window = window
+        self.clock = clock
+        self._last_run = {}  # normalized command -> time it last ran
+        self.seen = 0
+        self.suppressed = 0
+        self.repeats_allowed = 0
+        self.suppressed_by_command = Counter()
+
+    def should_run(self, command: str) -> bool:
+        """Return False for a duplicate of a recent command that must not repeat"""
+        key = IntentCache.normalize(command)
+        now = self.clock()
+        self.seen += 1
+
+        # Expire old entries so the table stays small
+        self._last_run = {k: t for k, t in self._last_run.items() if now - t <= self.window}
+        if key in self._last_run:
+            if not self.repeatable(key):
+                self.suppressed += 1
+                self.suppressed_by_command[key] += 1
+                return False
+            self.repeats_allowed += 1
+        # Only runs count, so repeating a suppressed command doesn't extend the window
+        self._last_run[key] = now
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'seen': self.seen,
+            'suppressed': self.suppressed,
+            'repeats_allowed': self.repeats_allowed,
+            'top_suppressed': self.suppressed_by_command.most_common(5),
+        }
+
+# ========== MACROS ==========
+class MacroStore:
+    def __init__(self, path: str = Config.MACROS_FILE):
+        self.path = Path(path)
+        self.macros = self._load()
+
+    def _load(self) -> dict:
+        """Load saved macros"""
+        try:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            Utils.log(f"Macro load failed: {e}", "WARNING")
+        return {}
+
+    def _save(self):
+        """Persist macros to disk"""
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.macros, f, indent=2)
+        except Exception as e:
+            Utils.log(f"Macro save failed: {e}", "WARNING")
+
+    def add(self, name: str, plan: str):
+        self.macros[name.strip().lower()] = plan.strip()
+        self._save()
+
+    def remove(self, name: str) -> bool:
+        if self.macros.pop(name.strip().lower(), None) is None:
+            return False
+        self._save()
+        return True
+
+    def get(self, name: str):
+        return self.macros.get(name.strip().lower())
+
+# ========== COMMAND PIPELINE ==========
+class CommandPipeline:
+    # "then" / "after that" start a new stage, "and" / "," join the current one
+    SEQUENTIAL = re.compile(r'(\s*,?\s*\b(?:and then|then|after that)\b\s*)', re.IGNORECASE)
+    PARALLEL = re.compile(r'(\s*(?:,|\band\b)\s*)', re.IGNORECASE)
+
+    def __init__(self, processor):
+        self.processor = processor
+        self.executor = ThreadPoolExecutor(max_workers=Config.PIPELINE_WORKERS)
+
+    def plan(self, command: str) -> list:
+        """Split an utterance into ordered stages of independent steps"""
+        steps = []
+        parts = self.SEQUENTIAL.split(command)
+        for i in range(0, len(parts), 2):
+            sequential_sep = parts[i - 1] if i else ""
+            chunk = self.PARALLEL.split(parts[i])
+            # "remind me to open the window and close the door in 5 minutes" is one
+            # command, only split when the text before the first "and" stands alone
+            if not self.processor.is_step(chunk[0]):
+                chunk = [parts[i]]
+            for j in range(0, len(chunk), 2):
+                fragment = chunk[j]
+                sep = chunk[j - 1] if j else sequential_sep
+                if not fragment:
+                    continue
+                # Fragments that aren't commands belong to the previous step's arguments
+                if steps and not self.processor.is_command(fragment):
+                    steps[-1][0] += sep + fragment
+                else:
+                    steps.append([fragment, j == 0])
+
+        # Keyboard/focus steps run alone: they wait for everything before them,
+        # and everything after them waits for them
+        stages = []
+        previous_focus = False
+        for text, new_stage in steps:
+            focus = self.needs_focus(text)
+            if new_stage or focus or previous_focus or not stages:
+                stages.append([])
+            stages[-1].append(text)
+            previous_focus = focus
+        return stages
+
+    def needs_focus(self, step: str) -> bool:
+        """Whether a step drives the keyboard or changes window focus"""
+        entry, _ = self.processor._match(step.strip())
+        return entry is not None and entry.focus
+
+    def run(self, stages: list, on_step=None) -> str:
+        """Run stages in order, steps inside a stage concurrently"""
+        responses = []
+        for stage in stages:
+            if len(stage) == 1:
+                results = [self.processor.process_single(stage[0])]
+            else:
+                results = list(self.executor.map(self.processor.process_single, stage))
+            for result in results:
+                if result == "exit":
+                    return "exit"
+                if on_step:
+                    on_step(result)
+                responses.append(result)
+        return " ".join(r if r.endswith(('.', '!', '?')) else f"{r}." for r in responses)
+
+# ========== HYPOTHESIS RESCORING ==========
+class HypothesisRescorer:
+    """Picks the recognizer alternative most likely to be an executable command"""
+    COMMAND_BONUS = 1.0  # resolves to a registered command
+    INTENT_BONUS = 0.5  # resolves to a built-in reply (time, jokes, ...)
+    VOCABULARY_BONUS = 0.3  # an app or key argument names a known app, site or key
+    VOCABULARY_SLOTS = ('app_name', 'action')
+    DEFAULT_CONFIDENCE = 0.8  # for a top alternative reported without confidence
+
+    def __init__(self, processor):
+        self.processor = processor
+        self._vocabulary = set()
+        self._vocabulary_words = 1  # longest vocabulary name, in words
+        self._vocabulary_version = None
+        self.calls = 0
+        self.changed = 0
+        self.total_time = 0.0
+
+    def vocabulary(self) -> set:
+        registry = self.processor.registry
+        if self._vocabulary_version != registry.version:
+            self._vocabulary = {' '.join(name.lower().split()) for table in
+                                (registry.apps, registry.urls, registry.processes, registry.youtube_keys)
+                                for name in table}
+            self._vocabulary_words = max((len(name.split()) for name in self._vocabulary), default=1)
+            self._vocabulary_version = registry.version
+        return self._vocabulary
+
+    def names_known(self, value: str) -> bool:
+        """Whether whole words of value spell a vocabulary name, so "the word" has "word"
+        but "the sword" doesn't"""
+        vocabulary = self.vocabulary()
+        words = value.lower().split()
+        return any(' '.join(words[i:j]) in vocabulary for i in range(len(words))
+                   for j in range(i + 1, min(len(words), i + self._vocabulary_words) + 1))
+
+    def score(self, text: str, rank: int, confidence: float = None, top_confidence: float = None) -> float:
+        # Google only reports confidence for the top alternative. The others are
+        # placed below it, so they can only win on a grammar or vocabulary bonus
+        if confidence is None:
+            top = top_confidence if top_confidence is not None else self.DEFAULT_CONFIDENCE
+            confidence = max(0.1, top * (1 - 0.15 * rank))
+        kind, args = self.processor.resolve(text.lower().strip())
+        if kind == 'exit':
+            # Shutting down on a homophone ("bye milk") is worse than a repeat turn
+            return confidence if rank == 0 else float('-inf')
+        if kind == 'fallback':
+            return confidence
+        if kind != 'command':
+            return confidence + self.INTENT_BONUS
+
+        score = confidence + self.COMMAND_BONUS
+        slots = args[1]
+        if any(self.names_known(str(slots[slot])) for slot in self.VOCABULARY_SLOTS if slot in slots):
+            score += self.VOCABULARY_BONUS
+        return score
+
+    def rescore(self, alternatives: list) -> list:
+        """(score, transcript) pairs, best first"""
+        top = alternatives[0].get('confidence')
+        scored = [(self.score(alt['transcript'], rank, alt.get('confidence'), top), -rank, alt['transcript'])
+                  for rank, alt in enumerate(alternatives)]
+        if self.processor.resolve(alternatives[0]['transcript'].lower().strip())[0] != 'fallback':
+            # A top hypothesis that already means something stays on top, an alternative
+            # that parses too ("type is it" for "what time is it") is another request
+            first, rest = scored[0], sorted(scored[1:], reverse=True)
+            return [(score, text) for score, _, text in [first] + rest]
+        scored.sort(reverse=True)
+        return [(score, text) for score, _, text in scored]
+
+    def best(self, alternatives: list) -> str:
+        start = time.perf_counter()
+        best = self.rescore(alternatives)[0][1]
+        self.total_time += time.perf_counter() - start
+        self.calls += 1
+        self.changed += best != alternatives[0]['transcript']
+        return best
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'changed': self.changed,
+            'avg_ms': round(self.total_time / self.calls * 1000, 3) if self.calls else 0.0,
+        }
+
 # ========== COMMAND PROCESSOR ==========
 class CommandProcessor:
-    def __init__(self):
+    SAVE_MACRO = re.compile(r'(?:save|create|record) macro (.+?) as (.+)', re.IGNORECASE)
+    DELETE_MACRO = re.compile(r'(?:delete|remove) macro (.+)', re.IGNORECASE)
+    LIST_MACROS = re.compile(r'(?:list|show) macros', re.IGNORECASE)
+    RUN_MACRO = re.compile(r'(?:run|play) macro (.+)', re.IGNORECASE)
+
+    def __init__(self, blocked_intents=()):
         self.automation = AutomationEngine()
-        self.commands = self._load_commands()
-    
-    def _load_commands(self):
-        """Load command patterns"""
-        return {
-            # Open commands
-            r'open (.+)': lambda m: self.automation.open_application(m.group(1)),
-            r'start (.+)': lambda m: self.automation.open_application(m.group(1)),
-            r'launch (.+)': lambda m: self.automation.open_application(m.group(1)),
-            
-            # Close commands
-            r'close (.+)': lambda m: self.automation.close_application(m.group(1)),
-            r'quit (.+)': lambda m: self.automation.close_application(m.group(1)),
-            r'exit (.+)': lambda m: self.automation.close_application(m.group(1)),
-            
-            # YouTube
-            r'play (.+) on youtube': lambda m: self.automation.youtube_search(m.group(1)),
-            r'search (.+) on youtube': lambda m: self.automation.youtube_search(m.group(1)),
-            r'youtube search (.+)': lambda m: self.automation.youtube_search(m.group(1)),
-            r'youtube (.+)': lambda m: self.automation.youtube_search(m.group(1)),
-            r'pause youtube': lambda: self.automation.youtube_control('pause'),
-            r'play youtube': lambda: self.automation.youtube_control('play'),
-            r'next video': lambda: self.automation.youtube_control('next'),
-            r'fullscreen youtube': lambda: self.automation.youtube_control('fullscreen'),
-            
-            # WhatsApp
-            r'send whatsapp to (\d+) (.+)': lambda m: self.automation.send_whatsapp(m.group(1), m.group(2)),
-            r'send whatsapp (.+) to (\d+)': lambda m: self.automation.send_whatsapp(m.group(2), m.group(1)),
-            r'whatsapp (.+) to (\d+)': lambda m: self.automation.send_whatsapp(m.group(2), m.group(1)),
-            
-            # Screenshot
-            r'take screenshot': lambda: self.automation.take_screenshot(),
-            r'capture screen': lambda: self.automation.take_screenshot(),
-            r'screenshot': lambda: self.automation.take_screenshot(),
-            
-            # Volume
-            r'volume up': lambda: self.automation.control_volume('up'),
-            r'volume down': lambda: self.automation.control_volume('down'),
-            r'increase volume': lambda: self.automation.control_volume('up'),
-            r'decrease volume': lambda: self.automation.control_volume('down'),
-            r'mute': lambda: self.automation.control_volume('mute'),
-            
-            # Search
-            r'search (.+)': lambda m: self.automation.web_search(m.group(1)),
-            r'google (.+)': lambda m: self.automation.web_search(m.group(1)),
-            
-            # System
-            r'system info': lambda: self.automation.system_info(),
-            r'computer info': lambda: self.automation.system_info(),
-            r'system status': lambda: self.automation.system_info(),
-            
-            # Files
-            r'create file (.+)': lambda m: self.automation.create_file(m.group(1)),
-            r'read file (.+)': lambda m: self.automation.read_file(m.group(1)),
-            
-            # Commands
-            r'run command (.+)': lambda m: self.automation.execute_command(m.group(1)),
-            r'execute (.+)': lambda m: self.automation.execute_command(m.group(1)),
-            
-            # Reminders
-            r'remind me to (.+) in (\d+) minutes': lambda m: self.automation.set_reminder(m.group(1), int(m.group(2))),
-            r'set reminder (.+) in (\d+) minutes': lambda m: self.automation.set_reminder(m.group(1), int(m.group(2))),
-            r'reminder (.+) in (\d+) minutes': lambda m: self.automation.set_reminder(m.group(1), int(m.group(2))),
-            
-            # Typing
-            r'type (.+)': lambda m: self.automation.type_text(m.group(1)),
-            r'press (.+)': lambda m: self.automation.press_key(m.group(1)),
-            
-            # Email
-            r'send email (.+) to (.+)': lambda m: self.automation.send_email(m.group(2), "Message from Alfred", m.group(1)),
-        }
-    
-    def process(self, command: str) -> str:
-        """Process command and return response"""
+        self.registry = AutomationEngine.command_registry()
+        self.blocked_intents = frozenset(blocked_intents)  # registry intents refused wherever they come from
+        self.intent_cache = IntentCache()
+        self._registry_version = self.registry.version
+        self.macros = MacroStore()
+        self.pipeline = CommandPipeline(self)
+        self.rescorer = HypothesisRescorer(self)
+
+    def refresh_commands(self):
+        """Pick up registry edits, dropping intents cached against the old table"""
+        self.registry.reload_if_changed()
+        if self.registry.version != self._registry_version:
+            self._registry_version = self.registry.version
+            self.intent_cache.clear()
+
+    def _match(self, command: str):
+        """Find the first registry entry matching the text"""
+        return self.registry.match(command)
+
+    def is_command(self, text: str) -> bool:
+        """Check whether text on its own is an automation command"""
+        return self._match(text.strip())[0] is not None
+
+    def is_step(self, text: str) -> bool:
+        """Check whether text on its own is a command or a built-in request"""
+        return self.resolve(text.strip())[0] != 'fallback'
+
+    def process_macro(self, command: str, on_step=None):
+        """Handle macro management, returns None if not a macro command"""
+        match = self.SAVE_MACRO.match(command)
+        if match:
+            self.macros.add(match.group(1), match.group(2))
+            return f"Macro {match.group(1)} saved"
+
+        match = self.DELETE_MACRO.match(command)
+        if match:
+            if self.macros.remove(match.group(1)):
+                return f"Macro {match.group(1)} deleted"
+            return f"No macro named {match.group(1)}"
+
+        if self.LIST_MACROS.match(command):
+            if not self.macros.macros:
+                return "No macros saved yet"
+            return "Saved macros: " + ", ".join(self.macros.macros)
+
+        match = self.RUN_MACRO.match(command)
+        name = match.group(1) if match else command
+        plan = self.macros.get(name)
+        if plan:
+            print(f"🔁 Macro {name.strip()}: {plan}")
+            return self.pipeline.run(self.pipeline.plan(plan), on_step)
+        if match:
+            return f"No macro named {name}"
+        return None
+
+    def process(self, command: str, on_step=None) -> str:
+        """Process command and return response, on_step gets each result of a multi-step plan"""
         if not command or command == "":
             return "I didn't hear anything"
-        
+
         print(f"⚡ Processing: {command}")
+        self.refresh_commands()
+
+        # Check for macros
+        response = self.process_macro(command, on_step)
+        if response is not None:
+            return response
+
+        # Repeated utterances skip planning and resolving altogether
+        key = IntentCache.normalize(command.strip())
+        cached = self.intent_cache.get(key)
+        if cached is None:
+            cached = self._plan_cached(command)
+            self.intent_cache.put(key, cached)
+
+        if cached.stages:
+            print(f"🧩 Plan: {' → '.join(' + '.join(stage) for stage in cached.stages)}")
+            return self.pipeline.run(cached.stages, on_step)
+        return self._run_cached(cached)
+
+    def process_single(self, command: str) -> str:
+        """Process a single command and return response"""
+        command = command.strip()
+        key = IntentCache.normalize(command)
+        cached = self.intent_cache.get(key)
+        if cached is None:
+            cached = self._resolve_cached(command)
+            self.intent_cache.put(key, cached)
+        elif cached.stages:
+            # Run as one step here, the cached plan stays for whole utterances
+            cached = self._resolve_cached(command)
+        return self._run_cached(cached)
+
+    def is_repeatable(self, command: str) -> bool:
+        """Whether running command again straight away is harmless: built-in replies
+        are, registry commands only when marked repeatable, plans when every step is"""
+        if self.RUN_MACRO.match(command) or self.macros.get(command):
+            return False
+        cached = self.intent_cache.peek(IntentCache.normalize(command.strip()))
+        return (cached or self._plan_cached(command)).repeatable
+
+    def _plan_cached(self, command: str) -> CachedIntent:
+        stages = self.pipeline.plan(command)
+        if sum(len(stage) for stage in stages) > 1:
+            repeatable = all(self._resolve_cached(step).repeatable for stage in stages for step in stage)
+            return CachedIntent(None, False, stages, repeatable)
+        return self._resolve_cached(command)
+
+    def _resolve_cached(self, command: str) -> CachedIntent:
+        command = command.strip()
+        intent = self.resolve(command)
+        if intent[0] != 'command':
+            return CachedIntent(intent, False, None, True)
+        entry, _ = self._match(command)
+        return CachedIntent(intent, entry.focus, None, entry.repeatable)
+
+    def _run_cached(self, cached: CachedIntent) -> str:
+        # Only one keyboard/focus driven action at a time across pipelines and clients
+        if cached.focus:
+            with AutomationEngine.focus_lock:
+                return self.execute(cached.intent)
+        return self.execute(cached.intent)
+
+    def resolve(self, command: str) -> tuple:
+        """Work out which intent a command maps to, without running it"""
+        entry, match = self._match(command)
+        
+        # "stop taking screenshots" ends a burst, it isn't a "stop" to quit on
+        if match and entry.intent == 'stop_screenshot_burst':
+            return ('command', (entry.intent, dict(entry.args)))
+        
+        # Keywords match whole words, so "this" isn't "hi" and "update" isn't "date"
+        lowered = command.lower()
+        words = set(re.findall(r"[a-z']+", lowered))
+        
+        exit_words = ['exit', 'quit', 'goodbye', 'bye', 'stop']
+        
+        # An utterance that starts with an exit word quits, even if a pattern matches it
+        if lowered.split()[:1] in [[word] for word in exit_words]:
+            return ('exit', None)
+        
+        # Try to match command patterns before keywords, so "send whatsapp to ... hello"
+        # sends the message instead of greeting
+        if match:
+            kwargs = dict(entry.args)
+            kwargs.update({k: v for k, v in match.groupdict().items() if v is not None})
+            return ('command', (entry.intent, kwargs))
         
         # Check for exit
-        if any(word in command for word in ['exit', 'quit', 'goodbye', 'bye', 'stop']):
-            return "exit"
+        if any(word in words for word in exit_words):
+            return ('exit', None)
         
         # Check for greetings
-        if any(word in command for word in ['hello', 'hi', 'hey']):
+        if any(word in words for word in ['hello', 'hi', 'hey']):
+            return ('greeting', None)
+        
+        # Check for thanks
+        if any(word in words for word in ['thank', 'thanks']):
+            return ('thanks', None)
+        
+        # Check for how are you
+        if 'how are you' in lowered:
+            return ('how_are_you', None)
+        
+        # Check for jokes
+        if 'joke' in lowered:
+            return ('joke', None)
+        
+        # Check for time
+        if 'time' in words:
+            return ('time', None)
+        
+        # Check for date
+        if 'date' in words:
+            return ('date', None)
+        
+        # Check for capabilities
+        if 'help' in words or any(phrase in lowered for phrase in ['what can you do', 'capabilities']):
+            return ('help', None)
+        
+        # Check for Jarvis mode
+        if any(word in lowered for word in ['jarvis', 'iron man', 'behave like']):
+            return ('jarvis', None)
+        
+        return ('fallback', None)
+
+    def execute(self, intent: tuple) -> str:
+        """Run a resolved intent and return response"""
+        kind, args = intent
+
+        if kind == 'exit':
+            return "exit"
+        
+        if kind == 'greeting':
             return random.choice([
                 "Hello! I'm Alfred, your automation assistant.",
                 "Hi there! Ready to help with automation.",
                 "Hey! What can I automate for you today?"
             ])
         
-        # Check for thanks
-        if any(word in command for word in ['thank', 'thanks']):
+        if kind == 'thanks':
             return random.choice([
                 "You're welcome!",
                 "Happy to help!",
                 "My pleasure!"
             ])
         
-        # Check for how are you
-        if 'how are you' in command:
+        if kind == 'how_are_you':
             return random.choice([
                 "I'm functioning perfectly!",
                 "All systems operational!",
                 "Ready for automation tasks!"
             ])
         
-        # Check for jokes
-        if 'joke' in command:
+        if kind == 'joke':
             try:
                 joke = pyjokes.get_joke()
                 return joke
@@ -572,21 +1649,19 @@ class CommandProcessor:
                 ]
                 return random.choice(jokes)
         
-        # Check for time
-        if 'time' in command:
+        if kind == 'time':
             return f"The time is {datetime.now().strftime('%I:%M %p')}"
         
-        # Check for date
-        if 'date' in command:
+        if kind == 'date':
             return f"Today is {datetime.now().strftime('%B %d, %Y')}"
         
-        # Check for capabilities
-        if any(phrase in command for phrase in ['what can you do', 'capabilities', 'help']):
+        if kind == 'help':
             return """I can automate:
 • Open/close applications
 • Control YouTube: play, search, pause, next
 • Send WhatsApp messages
-• Take screenshots
+• Take screenshots (full screen, active window, or every few seconds)
+• Stop interval screenshots: 'stop taking screenshots'
 • Control volume
 • Search the web
 • Create/read files
@@ -594,34 +1669,187 @@ class CommandProcessor:
 • Set reminders
 • Type text
 • Send emails
+• Chain commands: 'open chrome and search python then take screenshot'
+• Save macros: 'save macro morning as open gmail and open drive'
 • And much more!"""
         
-        # Check for Jarvis mode
-        if any(word in command for word in ['jarvis', 'iron man', 'behave like']):
+        if kind == 'jarvis':
             return "Activating J.A.R.V.I.S. protocol. Just Another Rather Very Intelligent System online. At your service, sir."
         
-        # Try to match command patterns
-        for pattern, action in self.commands.items():
-            match = re.match(pattern, command, re.IGNORECASE)
-            if match:
-                try:
-                    if match.groups():
-                        return action(match)
-                    else:
-                        return action()
-                except Exception as e:
-                    return f"Error executing command: {str(e)}"
+        if kind == 'command':
+            intent, kwargs = args
+            if intent in self.blocked_intents:
+                return f"{intent.replace('_', ' ').capitalize()} is disabled here"
+            handler = self.registry.handlers.get(intent)
+            if handler is None:
+                return "That command is no longer available"
+            try:
+                return handler(**kwargs)
+            except Exception as e:
+                return f"Error executing command: {str(e)}"
         
         # Default response
         return "I can help with automation. Try: 'open chrome', 'play music on youtube', 'take screenshot', or 'send whatsapp to 1234567890 hello'"
 
+# ========== DRY RUN ==========
+class DryRunAutomation:
+    """Stands in for AutomationEngine, records intents instead of acting on them"""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, intent):
+        if intent.startswith('_') or not hasattr(AutomationEngine, intent):
+            raise AttributeError(intent)
+
+        def handler(**kwargs):
+            with self._lock:
+                self.calls[intent] += 1
+            if self.delay:
+                time.sleep(self.delay)
+            args = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+            return f"[dry run] {intent}({args})"
+        return handler
+
+# ========== COMMAND SERVER ==========
+class ClientSession:
+    def __init__(self, session_id: str, repeatable):
+        self.id = session_id
+        self.debouncer = CommandDebouncer(repeatable)
+        self.history = deque(maxlen=Config.SERVER_HISTORY)
+        self.last_active = time.monotonic()
+
+
+class CommandSessionHandler(socketserver.StreamRequestHandler):
+    """JSON lines protocol: one request object per line, one or more reply lines per request
+
+    Request:  {"id": 1, "token": "...", "session": "phone", "command": "open chrome and search news"}
+              {"id": 2, "token": "...", "op": "history"}
+    Replies:  {"id": 1, "type": "step", "text": "..."} for each step of a multi-step plan
+              {"id": 1, "type": "done", "text": "..."} once the request is finished
+              {"type": "error", "error": "..."} before the connection is closed
+
+    The token is the contents of Config.SERVER_TOKEN_FILE. A line that isn't a JSON
+    object with the right token closes the connection, so a browser posting to the
+    port can't get a command through.
+    """
+    def setup(self):
+        super().setup()
+        # Replies are small lines, don't let Nagle hold them back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+
+    def send(self, message: dict):
+        # Pipeline steps report from worker threads
+        with self._send_lock:
+            self.wfile.write((json.dumps(message) + "\n").encode('utf-8'))
+
+    def handle(self):
+        default_session = f"{self.client_address[0]}:{self.client_address[1]}"
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+            except (ValueError, AttributeError):
+                self.send({'type': 'error', 'error': "Expected one JSON object per line"})
+                return
+            if not self.server.check_token(request.get('token')):
+                self.send({'id': request_id, 'type': 'error', 'error': "Missing or wrong token"})
+                return
+            session = self.server.session(str(request.get('session') or default_session))
+
+            if request.get('op') == 'history':
+                self.send({'id': request_id, 'type': 'done', 'session': session.id,
+                           'history': list(session.history)})
+                continue
+
+            command = str(request.get('command', '')).strip()
+            on_step = lambda text: self.send({'id': request_id, 'type': 'step', 'text': text})
+            response = self.server.run_command(session, command, on_step)
+            if response == "exit":
+                self.send({'id': request_id, 'type': 'done', 'session': session.id,
+                           'text': "Goodbye!", 'closed': True})
+                return
+            self.send({'id': request_id, 'type': 'done', 'session': session.id,
+                       'text': response, 'suppressed': response is None})
+
+
+class CommandServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128  # many front ends may connect at once
+
+    def __init__(self, processor, host: str = Config.SERVER_HOST, port: int = Config.SERVER_PORT,
+                 token: str = None, allow_unsafe: bool = False):
+        super().__init__((host, port), CommandSessionHandler)
+        self.processor = processor
+        self.allow_unsafe = allow_unsafe
+        if not allow_unsafe:
+            processor.blocked_intents |= set(Config.SERVER_UNSAFE_INTENTS)
+        self.token = token or self.load_token()
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    @staticmethod
+    def load_token(path: str = Config.SERVER_TOKEN_FILE) -> str:
+        """Read the shared token, creating one readable only by this user on first run"""
+        token_file = Path(path)
+        if token_file.exists():
+            return token_file.read_text(encoding='utf-8').strip()
+        token = secrets.token_urlsafe(32)
+        fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+        Utils.log(f"Created server token in {token_file}")
+        return token
+
+    def check_token(self, token) -> bool:
+        return isinstance(token, str) and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def session(self, session_id: str) -> ClientSession:
+        """Get or create a session, dropping ones that have gone idle"""
+        now = time.monotonic()
+        with self._sessions_lock:
+            idle = [sid for sid, s in self.sessions.items() if now - s.last_active > Config.SERVER_SESSION_TTL]
+            for sid in idle:
+                del self.sessions[sid]
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = ClientSession(session_id, self.processor.is_repeatable)
+            session.last_active = now
+            return session
+
+    def run_command(self, session: ClientSession, command: str, on_step=None):
+        """Process a command for a session, returns None if it was a suppressed duplicate"""
+        if command and not session.debouncer.should_run(command):
+            return None
+        response = self.processor.process(command, on_step)
+        session.history.append({'time': datetime.now().isoformat(), 'user': command, 'assistant': response})
+        return response
+
+    def serve(self):
+        host, port = self.server_address[:2]
+        Utils.log(f"Command server listening on {host}:{port}, clients send the token from {Config.SERVER_TOKEN_FILE}")
+        if self.allow_unsafe:
+            Utils.log("Unsafe intents are allowed over the socket", "WARNING")
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping command server...")
+        finally:
+            self.server_close()
+
 # ========== MAIN ASSISTANT ==========
 class Alfred:
     def __init__(self):
         Utils.ensure_directories()
         self.speech = SpeechEngine()
-        self.voice = VoiceRecognition()
         self.processor = CommandProcessor()
+        self.voice = VoiceRecognition(self.processor.rescorer)
+        self.debouncer = CommandDebouncer(self.processor.is_repeatable)
         self.running = False
         
         Utils.log(f"{Config.NAME} v{Config.VERSION} initialized")
@@ -639,6 +1867,8 @@ class Alfred:
         print("• 'play music on youtube' - Search & play YouTube")
         print("• 'send whatsapp to 1234567890 hello there' - Send WhatsApp")
         print("• 'take screenshot' - Capture screen")
+        print("• 'screenshot every 5 seconds for a minute' - Interval capture")
+        print("• 'stop taking screenshots' - End interval capture")
         print("• 'volume up' / 'volume down' / 'mute' - Control volume")
         print("• 'search python tutorials' - Web search")
         print("• 'system info' - Get system status")
@@ -646,6 +1876,8 @@ class Alfred:
         print("• 'remind me to call mom in 10 minutes' - Set reminders")
         print("• 'type hello world' - Type text")
         print("• 'press enter' - Press keys")
+        print("• 'open chrome and search news then take screenshot' - Chain commands")
+        print("• 'save macro morning as open gmail and open drive' - Save a macro")
         print("• 'behave like Jarvis' - Activate Iron Man mode")
         print("• 'exit' - Quit Alfred")
         print("="*70)
@@ -669,7 +1901,10 @@ class Alfred:
                 # Get voice input with retry
                 command = self.voice.listen_with_retry()
                 
-                if command:
+                if command and not self.debouncer.should_run(command):
+                    Utils.log(f"Duplicate command suppressed: {command}")
+                    self.speech.speak("I heard that a moment ago. Say it again in a few seconds to repeat it.")
+                elif command:
                     response = self.processor.process(command)
                     
                     if response == "exit":
@@ -702,6 +1937,9 @@ class Alfred:
                 Utils.log(f"Error: {e}", "ERROR")
                 time.sleep(1)
         
+        Utils.log(f"Intent cache: {self.processor.intent_cache.stats()}")
+        Utils.log(f"Duplicate suppression: {self.debouncer.stats()}")
+        Utils.log(f"Hypothesis rescoring: {self.processor.rescorer.stats()}")
         print("\n" + "="*70)
         print("👋 Alfred automation assistant stopped")
         print("="*70)
@@ -711,7 +1949,7 @@ if __name__ == "__main__":
     print("🚀 Initializing Alfred Ultimate Automation Assistant...")
     
     # Check and install missing packages
-    required = ['pyautogui', 'pyjokes', 'plyer', 'requests', 'pywin32', 'pygetwindow']
+    required = ['pyautogui', 'pyjokes', 'plyer', 'requests', 'pywin32', 'pygetwindow', 'numpy']
     for package in required:
         try:
             __import__(package.replace('-', '_'))
@@ -719,6 +1957,23 @@ if __name__ == "__main__":
             print(f"Installing {package}...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
     
+    parser = argparse.ArgumentParser(description=f"{Config.NAME} automation assistant")
+    parser.add_argument('--server', action='store_true', help="serve commands over a local socket instead of the microphone")
+    parser.add_argument('--host', default=Config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=Config.SERVER_PORT)
+    parser.add_argument('--allow-unsafe', action='store_true',
+                        help="let socket clients run commands and create or read files")
+    parser.add_argument('--dry-run', action='store_true', help="log automation intents instead of running them")
+    args = parser.parse_args()
+    
+    if args.dry_run:
+        AutomationEngine.registry = CommandRegistry(automation=DryRunAutomation())
+    
+    if args.server:
+        Utils.ensure_directories()
+        CommandServer(CommandProcessor(), args.host, args.port, allow_unsafe=args.allow_unsafe).serve()
+        sys.exit(0)
+    
     # Create and run assistant
     assistant = Alfred()
     
@@ -0,0 +1,627 @@
+# benchmarks.py
+import sys
+import io
+import json
+import socket
+import threading
+import contextlib
+import socketserver
+import time
+import random
+import secrets
+import tempfile
+import tracemalloc
+import wave
+from datetime import datetime
+from pathlib import Path
+
+import app
+
+
+def zipf_corpus(vocabulary, size, s=1.1, seed=42):
+    """Replay corpus where the k-th most common utterance has weight 1/k^s"""
+    rng = random.Random(seed)
+    weights = [1 / (k ** s) for k in range(1, len(vocabulary) + 1)]
+    return rng.choices(vocabulary, weights=weights, k=size)
+
+
+def utterance_vocabulary():
+    """Realistic utterances, including ones that fall through every pattern"""
+    registry = app.AutomationEngine.command_registry()
+    apps = list(registry.apps) + list(registry.urls)
+    vocabulary = []
+    for name in apps:
+        vocabulary += [f"open {name}", f"close {name}"]
+    for topic in ['python tutorials', 'lofi music', 'news', 'cricket score', 'weather']:
+        vocabulary += [f"search {topic}", f"play {topic} on youtube", f"google {topic}"]
+    vocabulary += [
+        "take screenshot", "volume up", "volume down", "system info", "pause youtube",
+        "behave like jarvis", "i have to present", "play dhurandhar title",
+        "remind me to stretch in 10 minutes", "what time is it", "tell me a joke",
+    ]
+    return vocabulary
+
+
+def bench_intent_cache(size=50000):
+    """Replay a Zipf-distributed corpus through CommandProcessor.process, with and
+    without the intent cache, against dry-run automation"""
+    size = int(size)
+    processor = app.CommandProcessor()
+    processor.registry = app.CommandRegistry(automation=app.DryRunAutomation())
+    processor._registry_version = processor.registry.version
+    corpus = zipf_corpus(utterance_vocabulary(), size)
+
+    def replay(cache):
+        processor.intent_cache = cache
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for utterance in corpus:
+                processor.process(utterance)
+        return time.perf_counter() - start
+
+    uncached = replay(app.IntentCache(max_size=0))
+    for cache_size in [16, 64, 256]:
+        cache = app.IntentCache(max_size=cache_size)
+        cached = replay(cache)
+        stats = cache.stats()
+        print(f"cache={cache_size:<4} hit_rate={stats['hit_rate']:.3f} "
+              f"evictions={stats['evictions']:<6} "
+              f"{cached / size * 1e6:.2f}us/utterance vs {uncached / size * 1e6:.2f}us uncached "
+              f"({uncached / cached:.1f}x)")
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic timing"""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def bench_debounce():
+    """Replay scripted and recorded command streams through the debouncer"""
+    processor = app.CommandProcessor()
+    processor.registry = app.CommandRegistry(automation=app.DryRunAutomation())
+    processor._registry_version = processor.registry.version
+    clock = FakeClock()
+    debouncer = app.CommandDebouncer(processor.is_repeatable, window=4.0, clock=clock)
+
+    # (seconds since previous command, command, expected to run)
+    script = [
+        (0.0, "send whatsapp to 9876543210 hello", True),
+        (0.8, "send whatsapp to 9876543210 hello", False),
+        (0.0, "take screenshot", True),
+        (0.5, "take screenshot", True),
+        (0.5, "close chrome", True),
+        (1.0, "close  chrome", False),
+        (5.0, "close chrome", True),
+        (0.2, "volume up", True),
+        (0.2, "volume up", True),
+        (10.0, "send whatsapp to 9876543210 hello", True),
+        # Suppressed repeats don't extend the window
+        (10.0, "open chrome", True),
+        (3.0, "open chrome", False),
+        (3.0, "open chrome", True),
+        (3.0, "open chrome", False),
+        (3.0, "open chrome", True),
+        # A plan repeats only if every step may repeat
+        (10.0, "take screenshot and send whatsapp to 9876543210 hello", True),
+        (0.5, "take screenshot and send whatsapp to 9876543210 hello", False),
+        (0.5, "volume up then send email hi to bob@example.com", True),
+        (0.5, "volume up then send email hi to bob@example.com", False),
+        (0.5, "take screenshot and volume up", True),
+        (0.5, "take screenshot and volume up", True),
+        # Built-in replies have no side effects
+        (0.5, "what time is it", True),
+        (0.5, "what time is it", True),
+        (0.5, "tell me a joke", True),
+        (0.5, "tell me a joke", True),
+    ]
+    for delay, command, expected in script:
+        clock.advance(delay)
+        result = debouncer.should_run(command)
+        assert result == expected, f"{command!r} at t={clock.now}: ran={result}, expected {expected}"
+    print(f"scripted: {len(script)} commands, {debouncer.stats()}")
+
+    # Recorded history, timed by its own timestamps
+    with open("conversation_history.json", encoding="utf-8") as f:
+        history = json.load(f)
+    clock = FakeClock()
+    debouncer = app.CommandDebouncer(processor.is_repeatable, clock=clock)
+    previous = None
+    for turn in history:
+        at = datetime.fromisoformat(turn["time"]).timestamp()
+        clock.advance(at - previous if previous else 0)
+        previous = at
+        debouncer.should_run(turn["user"])
+    print(f"conversation_history.json: {debouncer.stats()}")
+
+
+def synthetic_frame(width=3840, height=2160):
+    """Desktop-like 4K frame: flat gradients with some noisy regions"""
+    from PIL import Image
+    base = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.effect_noise((width // 4, height // 4), 64).convert('RGB')
+    base.paste(noise, (width // 8, height // 8))
+    return base
+
+
+def bench_screenshot(frames=20):
+    """Voice-thread cost of a capture vs synchronous save, using synthetic frames"""
+    frames = int(frames)
+    frame = synthetic_frame()
+    grab = lambda region=None: frame.crop(region and (region[0], region[1], region[0] + region[2], region[1] + region[3]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for i in range(frames):
+            grab().save(Path(directory) / f"sync_{i}.png")
+        sync = (time.perf_counter() - start) / frames
+        print(f"synchronous save (default PNG): {sync * 1000:.1f}ms/frame on the voice thread")
+
+    default_level = app.Config.SCREENSHOT_PNG_COMPRESSION
+    for image_format, level in [('png', 1), ('png', 6), ('webp', None)]:
+        app.Config.SCREENSHOT_PNG_COMPRESSION = level or default_level
+        with tempfile.TemporaryDirectory() as directory:
+            capture = app.ScreenCapture(directory, image_format, grab=grab)
+            start = time.perf_counter()
+            futures = []
+            for _ in range(frames):
+                futures.append(capture.capture()[1])
+                time.sleep(0.001)  # unique millisecond filenames
+            caller = (time.perf_counter() - start) / frames
+            for future in futures:
+                future.result()
+            total = time.perf_counter() - start
+            size = sum(f.stat().st_size for f in Path(directory).iterdir()) / frames
+            label = f"{image_format}" + (f" level {level}" if level is not None else "")
+            print(f"{label:<13} caller {caller * 1000:.1f}ms/frame, "
+                  f"{frames / total:.1f} frames/s encoded, {size / 1024:.0f}KB/frame")
+    app.Config.SCREENSHOT_PNG_COMPRESSION = default_level
+
+
+def synthetic_registry(path, size=10000, seed=7):
+    """Write commands.json padded with generated intents up to size patterns"""
+    rng = random.Random(seed)
+    with open(app.Config.COMMANDS_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    verbs = [f"verb{i}" for i in range(500)]
+    patterns = []
+    for i in range(size - sum(len(c['patterns']) for c in data['commands'])):
+        if i % 50 == 0:
+            patterns.append(f"(?:please )?{rng.choice(verbs)} thing{i} (?P<query>.+)")
+        else:
+            patterns.append(f"{rng.choice(verbs)} thing{i} (?P<query>.+)")
+    data['commands'].append({'intent': 'web_search', 'patterns': patterns})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return patterns
+
+
+def bench_registry(size=10000, lookups=2000):
+    """Reload time and dispatch cost for a large command registry"""
+    size, lookups = int(size), int(lookups)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "commands.json"
+        patterns = synthetic_registry(path, size)
+
+        start = time.perf_counter()
+        registry = app.CommandRegistry(path, plugins_dir=Path(directory) / "plugins")
+        print(f"initial load: {registry.size} patterns in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        reloads = 5
+        start = time.perf_counter()
+        for _ in range(reloads):
+            registry.reload()
+        print(f"reload: {(time.perf_counter() - start) / reloads * 1000:.1f}ms")
+
+        rng = random.Random(3)
+        utterances = [p.replace("(?:please )?", "").replace("(?P<query>.+)", "something")
+                      for p in rng.choices(patterns, k=lookups)]
+        utterances += ["open chrome", "take screenshot", "i have to present"] * (lookups // 10)
+
+        start = time.perf_counter()
+        for utterance in utterances:
+            registry.match(utterance)
+        indexed = (time.perf_counter() - start) / len(utterances)
+
+        entries = sorted([e for bucket in registry.index.values() for e in bucket] + registry.wildcard)
+        start = time.perf_counter()
+        for utterance in utterances:
+            next((e for e in entries if e.regex.match(utterance)), None)
+        linear = (time.perf_counter() - start) / len(utterances)
+        print(f"dispatch: {indexed * 1e6:.1f}us indexed vs {linear * 1e6:.1f}us linear scan "
+              f"({linear / indexed:.0f}x)")
+
+
+class WavSource:
+    """Microphone stand-in that reads PCM frames from a WAV file"""
+    def __init__(self, path):
+        self.wav = wave.open(str(path), 'rb')
+        self.SAMPLE_RATE = self.wav.getframerate()
+        self.CHUNK = 1024
+
+    def read(self, frames):
+        return self.wav.readframes(frames)
+
+
+def synthetic_wav(path, phrases=20, sample_rate=16000, seed=5):
+    """Quiet room noise with tone-burst 'phrases' of 0.5-3s"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(phrases):
+        parts.append(rng.normal(0, 40, int(rng.uniform(1.0, 2.0) * sample_rate)))
+        length = int(rng.uniform(0.5, 3.0) * sample_rate)
+        t = np.arange(length) / sample_rate
+        parts.append(3000 * np.sin(2 * np.pi * 220 * t) * np.sin(np.pi * t / t[-1]) + rng.normal(0, 40, length))
+    parts.append(rng.normal(0, 40, sample_rate))
+    samples = np.concatenate(parts).astype(np.int16)
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+
+def naive_listen(stream, capture):
+    """Baseline shaped like sr.Recognizer.listen: bytes chunks joined per phrase"""
+    frames, speaking, silence = [], False, 0.0
+    chunk_seconds = capture.chunk / capture.sample_rate
+    while True:
+        frame = stream.read(capture.chunk)
+        if not frame:
+            if not speaking:
+                return None
+            break
+        frames.append(frame)
+        energy = capture.energy(app.np.frombuffer(frame, dtype=app.np.int16))
+        if not speaking:
+            speaking = energy > capture.energy_threshold
+            frames = frames[-(capture.preroll // capture.chunk + 1):]
+            continue
+        silence = 0.0 if energy > capture.energy_threshold else silence + chunk_seconds
+        if silence >= capture.pause_threshold:
+            break
+    return b"".join(frames)
+
+
+def bench_audio_capture(*paths):
+    """Allocation and latency of utterance segmentation from WAV files"""
+    with tempfile.TemporaryDirectory() as directory:
+        if not paths:
+            paths = [Path(directory) / "synthetic.wav"]
+            synthetic_wav(paths[0])
+
+        def segment(source, capture, name):
+            """Run one segmenter over a file, returns (utterances, bytes of audio)"""
+            utterances, total_bytes = 0, 0
+            while True:
+                if name == 'ring buffer':
+                    try:
+                        data = capture.listen(source).data
+                    except app.sr.WaitTimeoutError:
+                        break
+                else:
+                    data = naive_listen(source, capture)
+                    if data is None:
+                        break
+                utterances += 1
+                total_bytes += len(data)
+            return utterances, total_bytes
+
+        for path in paths:
+            for name in ['ring buffer', 'bytes join']:
+                # Timed and traced in separate passes, tracemalloc slows numpy calls down
+                source = WavSource(path)
+                capture = app.RingBufferCapture(source.SAMPLE_RATE, source.CHUNK, dynamic_energy=False)
+                start = time.perf_counter()
+                utterances, total_bytes = segment(source, capture, name)
+                elapsed = time.perf_counter() - start
+
+                source = WavSource(path)
+                capture = app.RingBufferCapture(source.SAMPLE_RATE, source.CHUNK, dynamic_energy=False)
+                tracemalloc.start()
+                segment(source, capture, name)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{Path(path).name} {name:<12} {utterances} utterances, "
+                      f"{elapsed / max(utterances, 1) * 1000:.2f}ms each, "
+                      f"peak traced {peak / 1024:.0f}KB, {total_bytes / 1024:.0f}KB of audio")
+            print(f"(ring preallocated once: {capture.ring._data.nbytes / 1024:.0f}KB)")
+
+        # Clicks and pops shorter than the phrase threshold must not become utterances
+        import numpy as np
+        rng = np.random.default_rng(9)
+        click = np.full(1024, 8000)
+        silence = lambda: rng.normal(0, 40, 16000)
+        samples = np.concatenate([silence()] + [np.concatenate([click, silence()]) for _ in range(10)])
+        with wave.open(str(Path(directory) / "clicks.wav"), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(samples.astype(np.int16).tobytes())
+        source = WavSource(Path(directory) / "clicks.wav")
+        capture = app.RingBufferCapture(source.SAMPLE_RATE, source.CHUNK, dynamic_energy=False)
+        try:
+            utterance = capture.listen(source)
+            raise AssertionError(f"a 64ms click became a {utterance.duration:.2f}s utterance")
+        except app.sr.WaitTimeoutError:
+            print("clicks.wav   10 clicks of 64ms, 0 utterances")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def bench_server(clients=100, requests=20):
+    """Requests/sec and tail latency of the command server with dry-run automation"""
+    clients, requests = int(clients), int(requests)
+    app.AutomationEngine.registry = app.CommandRegistry(automation=app.DryRunAutomation())
+    token = secrets.token_urlsafe(32)
+    server = app.CommandServer(app.CommandProcessor(), port=0, token=token)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # A browser POST, a wrong token and an unsafe intent must not get a command run
+    def exchange(*lines):
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall("".join(line + "\n" for line in lines).encode())
+            sock.shutdown(socket.SHUT_WR)
+            return [json.loads(line) for line in sock.makefile('r', encoding='utf-8')]
+    with contextlib.redirect_stdout(io.StringIO()):
+        post = exchange("POST / HTTP/1.1", "Content-Type: text/plain", "",
+                        json.dumps({'id': 1, 'token': token, 'command': "open chrome"}))
+        wrong = exchange(json.dumps({'id': 1, 'token': "guess", 'command': "open chrome"}))
+        unsafe = exchange(json.dumps({'id': 1, 'token': token, 'command': "execute dir"}))
+    assert [reply['type'] for reply in post] == ['error'], post
+    assert [reply['type'] for reply in wrong] == ['error'], wrong
+    assert 'disabled' in unsafe[0]['text'], unsafe
+
+    # Numbered so per-session duplicate suppression doesn't kick in
+    commands = ["open chrome {i}", "search python tutorials {i}", "take screenshot", "volume up",
+                "what time is it {i}", "open gmail and open drive {i} then system info",
+                "send whatsapp to 9876543210 hello {i}", "type hello world {i}"]
+    latencies, errors = [], []
+    lock = threading.Lock()
+    ready = threading.Barrier(clients + 1)
+
+    def client(n):
+        mine = []
+        try:
+            with socket.create_connection(("127.0.0.1", port)) as sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                reader = sock.makefile('r', encoding='utf-8')
+                ready.wait()
+                for i in range(requests):
+                    command = commands[(n + i) % len(commands)].format(i=i)
+                    start = time.perf_counter()
+                    sock.sendall((json.dumps({'id': i, 'token': token, 'session': f"client{n}",
+                                               'command': command}) + "\n").encode())
+                    while json.loads(reader.readline())['type'] != 'done':
+                        pass
+                    mine.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(e)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ready.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    app.AutomationEngine.registry = None
+
+    print(f"{clients} clients x {requests} requests: {len(latencies) / elapsed:.0f} req/s, "
+          f"p50 {percentile(latencies, 50) * 1000:.1f}ms, p95 {percentile(latencies, 95) * 1000:.1f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms, "
+          f"{len(errors)} client errors")
+
+
+class FakeSmtpServer(socketserver.ThreadingTCPServer):
+    """In-process SMTP stand-in that records messages and can refuse the first few"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, fail_first=0):
+        super().__init__(("127.0.0.1", 0), FakeSmtpHandler)
+        self.fail_remaining = fail_first
+        self.messages = []
+        self.lock = threading.Lock()
+
+
+class FakeSmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        self.reply("220 localhost fake smtp")
+        envelope = {}
+        for raw in self.rfile:
+            line = raw.decode().rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO", "RSET", "NOOP"):
+                self.reply("250 ok")
+            elif verb == "MAIL":
+                with self.server.lock:
+                    refuse = self.server.fail_remaining > 0
+                    self.server.fail_remaining -= refuse
+                self.reply("451 try again later" if refuse else "250 ok")
+            elif verb == "RCPT":
+                envelope['to'] = line.split(":", 1)[1].strip("<> ")
+                self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 end with .")
+                lines = []
+                for data in self.rfile:
+                    data = data.decode().rstrip("\r\n")
+                    if data == ".":
+                        break
+                    lines.append(data[1:] if data.startswith("..") else data)
+                with self.server.lock:
+                    self.server.messages.append((envelope.get('to'), "\n".join(lines)))
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+def bench_outbox(messages=60, recipients=5, fail_first=3):
+    """Queue emails through the SMTP backend against a local fake server"""
+    messages, recipients, fail_first = int(messages), int(recipients), int(fail_first)
+    smtp = FakeSmtpServer(fail_first)
+    threading.Thread(target=smtp.serve_forever, daemon=True).start()
+    retry_base = app.Config.OUTBOX_RETRY_BASE
+    app.Config.OUTBOX_RETRY_BASE = 0.05
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue = app.MessageQueue(str(Path(directory) / "outbox.db"))
+        backend = app.SmtpBackend("127.0.0.1", smtp.server_address[1], sender="alfred@localhost", starttls=False)
+        outbox = app.Outbox(queue, {'email': backend})
+
+        start = time.perf_counter()
+        ids = [outbox.send('email', f"user{i % recipients}@example.com", f"message {i}", "Benchmark")
+               for i in range(messages)]
+        enqueued = time.perf_counter() - start
+
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            rows = queue.latest(limit=messages)
+            if all(row['status'] in ('sent', 'failed') for row in rows):
+                break
+            time.sleep(0.02)
+        elapsed = time.perf_counter() - start
+        outbox.stop()
+
+        rows = queue.latest(limit=messages)
+        sent = sum(row['status'] == 'sent' for row in rows)
+        retried = sum(row['attempts'] > 0 for row in rows)
+        delivered = sum(body.count("message ") for _, body in smtp.messages)
+        assert sent == messages and delivered == messages, f"{sent} sent, {delivered} delivered of {messages}"
+        assert len(ids) == len(set(ids))
+        print(f"{messages} emails to {recipients} recipients: enqueue {enqueued / messages * 1000:.2f}ms each, "
+              f"all delivered in {elapsed:.2f}s as {len(smtp.messages)} SMTP sends "
+              f"({retried} messages retried after {fail_first} refusals)")
+        queue.db.close()
+
+    app.Config.OUTBOX_RETRY_BASE = retry_base
+    smtp.shutdown()
+    smtp.server_close()
+
+
+ASR_CONFUSIONS = {
+    'open': ['often', 'hope in'], 'close': ['clothes'], 'chrome': ['crome', 'grown'],
+    'screenshot': ['screen shot', 'screens hot'], 'take': ['tech'], 'volume': ['valium'],
+    'youtube': ['you tube'], 'search': ['such'], 'system': ['sister'], 'notepad': ['note pad'],
+    'spotify': ['spot if i'], 'gmail': ['g mail'], 'mute': ['mood'], 'calculator': ['calculate her'],
+}
+
+
+def nbest_corpus(size=300, error_rate=0.35, opposite_rate=0.15, seed=11):
+    """Google-style N-best lists where the top hypothesis is sometimes misheard,
+    and sometimes right with a different valid command ranked below it"""
+    rng = random.Random(seed)
+    commands = ["open chrome", "close chrome", "open notepad", "take screenshot", "volume up",
+                "search python tutorials", "play lofi music on youtube", "system info", "open youtube",
+                "mute", "open spotify", "open gmail", "open calculator", "close notepad"]
+    opposites = {"open": "close", "close": "open", "up": "down"}
+
+    def mishear(text):
+        words = text.split()
+        options = [i for i, w in enumerate(words) if w in ASR_CONFUSIONS]
+        if not options:
+            return text + " please"
+        i = rng.choice(options)
+        words[i] = rng.choice(ASR_CONFUSIONS[words[i]])
+        return " ".join(words)
+
+    corpus = []
+    for _ in range(size):
+        expected = rng.choice(commands)
+        alternatives = [mishear(expected) for _ in range(rng.randint(1, 3))]
+        if rng.random() < error_rate:
+            alternatives.insert(rng.randint(1, len(alternatives)), expected)
+            confidence = rng.uniform(0.5, 0.8)
+        else:
+            alternatives.insert(0, expected)
+            confidence = rng.uniform(0.5, 0.97)
+            opposite = " ".join(opposites.get(w, w) for w in expected.split())
+            if opposite != expected and rng.random() < opposite_rate:
+                alternatives.insert(1, opposite)
+        unique = list(dict.fromkeys(alternatives))
+        corpus.append({'expected': expected,
+                       'alternatives': [{'transcript': t} for t in unique]})
+        corpus[-1]['alternatives'][0]['confidence'] = confidence
+    return corpus
+
+
+def bench_rescoring(path=None):
+    """Repeat turns, wrong commands and accuracy of top-1 vs grammar-rescored N-best lists"""
+    # N-best files: [{"expected": "...", "alternatives": [{"transcript": ..., "confidence": ...}]}],
+    # or {"samples": [...]} as in nbest_samples.json
+    corpora = []
+    for name in [path] if path else ["nbest_samples.json"]:
+        with open(name, encoding='utf-8') as f:
+            data = json.load(f)
+        corpora.append((Path(name).name, data['samples'] if isinstance(data, dict) else data))
+    if not path:
+        corpora.append(("synthetic", nbest_corpus()))
+    processor = app.CommandProcessor()
+
+    for name, corpus in corpora:
+        rescorer = app.HypothesisRescorer(processor)
+
+        def evaluate(choose):
+            repeats = wrong = correct = 0
+            for item in corpus:
+                text = choose(item['alternatives']).lower()
+                intent = processor.resolve(text)
+                repeats += intent[0] == 'fallback' and text != item['expected']
+                # Something other than what was said gets run, or Alfred quits
+                wrong += intent[0] in ('command', 'exit') and intent != processor.resolve(item['expected'])
+                correct += text == item['expected']
+            return repeats, wrong, correct
+
+        top_repeats, top_wrong, top_correct = evaluate(lambda alternatives: alternatives[0]['transcript'])
+        repeats, wrong, correct = evaluate(rescorer.best)
+        n = len(corpus)
+        print(f"{name}: {n} utterances")
+        print(f"  top-1:    {top_repeats} repeat turns, {top_wrong} wrong commands, {top_correct / n:.1%} correct")
+        print(f"  rescored: {repeats} repeat turns, {wrong} wrong commands, {correct / n:.1%} correct, "
+              f"{rescorer.stats()['avg_ms'] * 1000:.0f}us per N-best list")
+
+
+BENCHMARKS = {
+    'intent_cache': bench_intent_cache,
+    'debounce': bench_debounce,
+    'screenshot': bench_screenshot,
+    'registry': bench_registry,
+    'audio_capture': bench_audio_capture,
+    'server': bench_server,
+    'outbox': bench_outbox,
+    'rescoring': bench_rescoring,
+}
+
+if __name__ == "__main__":
+    # python benchmarks.py [name[:arg,arg] ...], e.g. audio_capture:mic1.wav,mic2.wav
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        name, _, args = name.partition(':')
+        print("="*50)
+        print(f"Benchmark: {name}")
+        print("="*50)
+        BENCHMARKS[name](*[a for a in args.split(',') if a])
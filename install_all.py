@@ -2,40 +2,16 @@
 import subprocess
 import sys
 import os
+import json
+import argparse
+from importlib import metadata
 
-def run_command(command):
-    """Run a command and print output"""
-    print(f"Running: {command}")
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(result.stdout)
-        if result.stderr:
-            print(f"Warnings: {result.stderr}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e.stderr}")
-        return False
+LOCK_FILE = "requirements.lock.json"
 
-def install_all():
-    """Install all required modules for Alfred Assistant"""
-    
-    # First upgrade pip
-    print("="*50)
-    print("Upgrading pip...")
-    print("="*50)
-    run_command(f"{sys.executable} -m pip install --upgrade pip")
-    
-    # Install cmake first (needed for some packages)
-    print("\n" + "="*50)
-    print("Installing cmake...")
-    print("="*50)
-    run_command(f"{sys.executable} -m pip install cmake")
-    
-    # Basic packages
-    print("\n" + "="*50)
-    print("Installing basic packages...")
-    print("="*50)
-    basic_packages = [
+# Grouped for readability, installed together in one pip run
+PACKAGES = {
+    'build tools': ['cmake'],
+    'basic': [
         'numpy',
         'pandas',
         'requests',
@@ -49,112 +25,214 @@ def install_all():
         'pyjokes',
         'selenium',
         'pytube'
-    ]
-    
-    for package in basic_packages:
-        print(f"\nInstalling {package}...")
-        run_command(f"{sys.executable} -m pip install {package}")
-    
-    # Speech recognition packages
-    print("\n" + "="*50)
-    print("Installing speech recognition packages...")
-    print("="*50)
-    speech_packages = [
+    ],
+    'speech recognition': [
         'SpeechRecognition',
         'PyAudio'
-    ]
-    
-    for package in speech_packages:
-        print(f"\nInstalling {package}...")
-        run_command(f"{sys.executable} -m pip install {package}")
-    
-    # Computer vision packages
-    print("\n" + "="*50)
-    print("Installing computer vision packages...")
-    print("="*50)
-    cv_packages = [
+    ],
+    'computer vision': [
         'opencv-python',
         'mediapipe'
-    ]
-    
-    for package in cv_packages:
-        print(f"\nInstalling {package}...")
-        run_command(f"{sys.executable} -m pip install {package}")
-    
-    # AI/ML packages
-    print("\n" + "="*50)
-    print("Installing AI/ML packages...")
-    print("="*50)
-    ai_packages = [
+    ],
+    'AI/ML': [
         'spacy',
         'transformers',
         'torch',
-        'google-generativeai'
-    ]
-    
-    for package in ai_packages:
-        print(f"\nInstalling {package}...")
-        run_command(f"{sys.executable} -m pip install {package}")
-    
-    # GUI/Automation packages
-    print("\n" + "="*50)
-    print("Installing GUI/Automation packages...")
-    print("="*50)
-    gui_packages = [
+        'google-generativeai',
+        'tensorflow'
+    ],
+    'GUI/Automation': [
         'pygame',
-        'pyautogui'
-    ]
-    
-    for package in gui_packages:
-        print(f"\nInstalling {package}...")
-        run_command(f"{sys.executable} -m pip install {package}")
-    
-    # Windows specific packages
+        'pyautogui',
+        'pygetwindow',
+        'pyperclip'
+    ],
+}
+
+if os.name == 'nt':  # Windows
+    PACKAGES['Windows specific'] = ['pywin32']
+
+SPACY_MODEL = 'en_core_web_sm'
+SPACY_MODEL_VERSION = '3.8.0'  # must match spaCy's major.minor, used unless locked
+# The model isn't on PyPI, pip fetches it from the spaCy release wheels
+SPACY_MODEL_URL = ("https://github.com/explosion/spacy-models/releases/download/"
+                   "{name}-{version}/{name}-{version}-py3-none-any.whl")
+
+# Import names checked after installing
+TEST_IMPORTS = [
+    'speech_recognition',
+    'pyttsx3',
+    'requests',
+    'bs4',
+    'dotenv',
+    'transformers',
+    'spacy',
+    'cv2',
+    'mediapipe',
+    'google.generativeai'
+]
+
+def run_command(command):
+    """Run a command and print output"""
+    print(f"Running: {' '.join(command)}")
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        print(result.stdout)
+        if result.stderr:
+            print(f"Warnings: {result.stderr}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {e.stderr}")
+        return False
+
+def installed_version(package):
+    """Installed version of a distribution, or None"""
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+def load_lock():
+    """Versions recorded by the last successful run"""
+    try:
+        with open(LOCK_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('packages', {})
+    except (OSError, ValueError):
+        return {}
+
+def write_lock(packages):
+    """Record installed versions so later runs reinstall the same ones"""
+    lock = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'packages': {p: installed_version(p) for p in packages if installed_version(p)},
+    }
+    with open(LOCK_FILE, 'w', encoding='utf-8') as f:
+        json.dump(lock, f, indent=2)
+    print(f"Wrote {LOCK_FILE} ({len(lock['packages'])} packages)")
+
+def missing_packages(packages, force=False):
+    """Requirements that are not installed yet"""
+    missing = []
+    for package in packages:
+        version = installed_version(package)
+        if version and not force:
+            print(f"✓ {package} {version} already installed")
+        else:
+            missing.append(package)
+    return missing
+
+def pip_install(packages, lock, wheelhouse=None, upgrade=False):
+    """Install packages in a single pip run, pinned to the lock file when present"""
+    if upgrade:
+        requirements = list(packages)
+        command = [sys.executable, "-m", "pip", "install", "--upgrade"]
+    else:
+        requirements = [f"{p}=={lock[p]}" if p in lock else p for p in packages]
+        command = [sys.executable, "-m", "pip", "install"]
+    if wheelhouse:
+        command += ["--no-index", "--find-links", wheelhouse]
+    return run_command(command + requirements)
+
+def install_packages(packages, lock, wheelhouse=None, upgrade=False):
+    """Install packages, returns the ones that failed.
+
+    One pip run resolves everything together, but a single failing build fails
+    the whole run, so on error every package is retried on its own."""
+    if pip_install(packages, lock, wheelhouse, upgrade):
+        return []
+    print("\nInstalling together failed, retrying one package at a time...")
+    return [p for p in packages if not pip_install([p], lock, wheelhouse, upgrade)]
+
+def spacy_model_url(lock):
+    version = lock.get(SPACY_MODEL, SPACY_MODEL_VERSION)
+    return SPACY_MODEL_URL.format(name=SPACY_MODEL, version=version)
+
+def build_wheelhouse(packages, lock, wheelhouse):
+    """Download wheels for every package and the spaCy model for later offline installs"""
+    requirements = [f"{p}=={lock[p]}" if p in lock else p for p in packages]
+    requirements.append(spacy_model_url(lock))
+    return run_command([sys.executable, "-m", "pip", "download", "-d", wheelhouse] + requirements)
+
+def verify_imports(modules):
+    """Import every module in one fresh interpreter and report the results"""
+    script = (
+        "import importlib, json, sys\n"
+        "results = {}\n"
+        "for name in sys.argv[1:]:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "        results[name] = None\n"
+        "    except Exception as e:\n"
+        "        results[name] = str(e)\n"
+        "print(json.dumps(results))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script] + modules, capture_output=True, text=True)
+    try:
+        results = json.loads(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        print(f"✗ Verification failed: {result.stderr}")
+        return False
+
+    for module, error in results.items():
+        if error is None:
+            print(f"✓ {module} installed successfully")
+        else:
+            print(f"✗ {module} not installed: {error}")
+    return all(error is None for error in results.values())
+
+def install_all(force=False, wheelhouse=None, upgrade_pip=False):
+    """Install all required modules for Alfred Assistant"""
+    packages = [p for group in PACKAGES.values() for p in group]
+    lock = load_lock()
+
+    if upgrade_pip:
+        print("="*50)
+        print("Upgrading pip...")
+        print("="*50)
+        run_command([sys.executable, "-m", "pip", "install", "--upgrade", "pip"])
+
     print("\n" + "="*50)
-    print("Installing Windows specific packages...")
+    print("Checking installed packages...")
     print("="*50)
-    if os.name == 'nt':  # Windows
-        run_command(f"{sys.executable} -m pip install pywin32")
-    
+    missing = missing_packages(packages, force)
+    failed = []
+
+    if missing:
+        print("\n" + "="*50)
+        print(f"Installing {len(missing)} packages...")
+        print("="*50)
+        failed = install_packages(missing, lock, wheelhouse, upgrade=force)
+    else:
+        print("\nAll packages already installed")
+
     # Install spacy model
-    print("\n" + "="*50)
-    print("Installing spaCy English model...")
-    print("="*50)
-    run_command(f"{sys.executable} -m spacy download en_core_web_sm")
-    
-    # Install TensorFlow (CPU version for compatibility)
-    print("\n" + "="*50)
-    print("Installing TensorFlow...")
-    print("="*50)
-    run_command(f"{sys.executable} -m pip install tensorflow")
-    
+    if installed_version(SPACY_MODEL) is None or force:
+        print("\n" + "="*50)
+        print("Installing spaCy English model...")
+        print("="*50)
+        if wheelhouse:
+            installed = pip_install([SPACY_MODEL], lock, wheelhouse)
+        else:
+            installed = run_command([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+        if not installed:
+            failed.append(SPACY_MODEL)
+
+    # Only a complete install is worth pinning
+    if failed:
+        print(f"\n✗ Failed to install: {', '.join(failed)} (see errors above)")
+        print(f"{LOCK_FILE} not updated")
+    else:
+        write_lock(packages + [SPACY_MODEL])
+
     # Verify installations
     print("\n" + "="*50)
     print("Verifying installations...")
     print("="*50)
-    
-    test_imports = [
-        'speech_recognition',
-        'pyttsx3',
-        'requests',
-        'bs4',
-        'dotenv',
-        'transformers',
-        'spacy',
-        'cv2',
-        'mediapipe',
-        'google.generativeai'
-    ]
-    
-    for module in test_imports:
-        try:
-            __import__(module.replace('.', '_'))
-            print(f"✓ {module} installed successfully")
-        except ImportError as e:
-            print(f"✗ {module} not installed: {e}")
-    
+    verified = verify_imports(TEST_IMPORTS)
+
     print("\n" + "="*50)
-    print("Installation complete!")
+    print("Installation complete!" if verified and not failed else "Installation finished with errors")
     print("="*50)
     print("\nAdditional setup needed:")
     print("1. Download ChromeDriver from: https://chromedriver.chromium.org/")
@@ -162,15 +240,28 @@ def install_all():
     print("3. Create a .env file with your API keys:")
     print("   - NEWS_API_KEY=your_newsapi_key")
     print("   - API_KEY=your_gemini_api_key")
-    print("\nRun your assistant with: python alfred_assistant.py")
+    print("\nRun your assistant with: python app.py")
+    return verified and not failed
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Install all required packages for Alfred")
+    parser.add_argument('-y', '--yes', action='store_true', help="don't ask for confirmation")
+    parser.add_argument('--force', action='store_true', help="upgrade packages even if already installed")
+    parser.add_argument('--wheelhouse', help="install offline from this directory of wheels")
+    parser.add_argument('--build-wheelhouse', metavar='DIR', help="download wheels into DIR and exit")
+    parser.add_argument('--upgrade-pip', action='store_true', help="upgrade pip first")
+    args = parser.parse_args()
+
+    if args.build_wheelhouse:
+        packages = [p for group in PACKAGES.values() for p in group]
+        sys.exit(0 if build_wheelhouse(packages, load_lock(), args.build_wheelhouse) else 1)
+
     print("Alfred Assistant - Complete Installation Script")
-    print("This will install all required packages for the assistant.")
-    print("The installation may take 10-15 minutes depending on your internet speed.")
-    
-    response = input("\nDo you want to proceed with installation? (y/n): ")
+    print("This will install any missing packages for the assistant.")
+    print("A first install may take 10-15 minutes depending on your internet speed.")
+
+    response = 'y' if args.yes else input("\nDo you want to proceed with installation? (y/n): ")
     if response.lower() == 'y':
-        install_all()
+        sys.exit(0 if install_all(args.force, args.wheelhouse, args.upgrade_pip) else 1)
     else:
-        print("Installation cancelled.")
\ No newline at end of file
+        print("Installation cancelled.")
@@ -0,0 +1,397 @@
+# soak.py
+"""Long-running soak test: drives Alfred end to end through a scripted day of
+use with simulated microphone, recognizer, speech and desktop automation,
+on an accelerated clock. Runs headless.
+
+    python soak.py                      # 24h workload, compare with soak_baseline.json
+    python soak.py --hours 2            # shorter run, only compared with a baseline of the same workload
+    python soak.py --update-baseline    # record the current numbers as the baseline
+"""
+import os
+import sys
+import io
+import json
+import time
+import types
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+import contextlib
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+BASELINE_FILE = ROOT / "soak_baseline.json"
+
+
+# ========== SIMULATED DESKTOP ==========
+class FakeFrame:
+    """Stands in for a PIL screenshot"""
+    def __init__(self, region=None):
+        self.region = region
+
+    def save(self, path, format=None, **options):
+        with open(path, 'wb') as f:
+            f.write(b"\x89PNG" + os.urandom(2048))
+
+
+class FakeWindow:
+    title = "WhatsApp"
+    left, top, width, height = 0, 0, 1280, 720
+
+
+def install_desktop_fakes():
+    """GUI and Windows-only modules are replaced by recording fakes, so nothing
+    touches a real desktop and the soak runs without a display"""
+    actions = []
+
+    pyautogui = types.ModuleType('pyautogui')
+    pyautogui.press = lambda key, presses=1, **kw: actions.append(('press', key))
+    pyautogui.write = lambda text, interval=0.0: actions.append(('write', text))
+    pyautogui.screenshot = lambda region=None: FakeFrame(region)
+
+    pygetwindow = types.ModuleType('pygetwindow')
+    pygetwindow.getActiveWindow = lambda: FakeWindow()
+
+    pyperclip = types.ModuleType('pyperclip')
+
+    win32com = types.ModuleType('win32com')
+    win32com.client = types.ModuleType('win32com.client')
+    win32com.client.Dispatch = lambda name: types.SimpleNamespace(Speak=lambda text: None)
+
+    plyer = types.ModuleType('plyer')
+    plyer.notification = types.SimpleNamespace(notify=lambda **kw: actions.append(('notify', kw.get('message'))))
+
+    sys.modules.update({
+        'pyautogui': pyautogui,
+        'pygetwindow': pygetwindow,
+        'pyperclip': pyperclip,
+        'win32com': win32com,
+        'win32com.client': win32com.client,
+        'plyer': plyer,
+    })
+    return actions
+
+
+class AcceleratedClock:
+    """time module stand-in: sleeps are shortened by speedup, and advance()
+    jumps the clock forward to simulate idle time between turns"""
+    def __init__(self, speedup):
+        self.speedup = speedup
+        self.offset = 0.0
+        self._lock = threading.Lock()
+        self._real_start = time.monotonic()
+        self._wall_start = time.time()
+
+    def _elapsed(self):
+        return (time.monotonic() - self._real_start) * self.speedup + self.offset
+
+    def monotonic(self):
+        return self._real_start + self._elapsed()
+
+    def time(self):
+        return self._wall_start + self._elapsed()
+
+    def sleep(self, seconds):
+        # Wakes on the virtual clock, so advance() shortens sleeps in progress
+        deadline = self.monotonic() + seconds
+        while True:
+            remaining = deadline - self.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining / self.speedup, 0.01))
+
+    def advance(self, seconds):
+        with self._lock:
+            self.offset += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+# ========== SIMULATED AUDIO AND SPEECH ==========
+class FakeStream:
+    def __init__(self, microphone):
+        self.microphone = microphone
+
+    def read(self, frames):
+        return self.microphone.read(frames)
+
+
+class FakeMicrophone:
+    """Plays a short burst of 'speech' between silences for every turn"""
+    SAMPLE_RATE = 16000
+    CHUNK = 1024
+
+    def __init__(self, seed=3):
+        rng = np.random.default_rng(seed)
+        t = np.arange(int(0.9 * self.SAMPLE_RATE)) / self.SAMPLE_RATE
+        speech = 3000 * np.sin(2 * np.pi * 220 * t) * np.sin(np.pi * t / t[-1])
+        silence = lambda seconds: rng.normal(0, 40, int(seconds * self.SAMPLE_RATE))
+        self.turn_audio = np.concatenate([silence(0.3), speech, silence(1.2)]).astype(np.int16).tobytes()
+        self.stream = FakeStream(self)
+        self.opened = 0
+        self.open = False
+        self.position = 0
+        self.on_open = None
+
+    def __enter__(self):
+        if self.open:
+            raise RuntimeError("Microphone opened twice without being closed")
+        self.open = True
+        self.opened += 1
+        self.position = 0
+        if self.on_open:
+            self.on_open()
+        return self
+
+    def __exit__(self, *exc):
+        self.open = False
+
+    def read(self, frames):
+        size = frames * 2
+        chunk = self.turn_audio[self.position:self.position + size]
+        self.position += size
+        return chunk
+
+
+class FakeRecognizer:
+    """Returns the scripted N-best list for each turn"""
+    def __init__(self, script, clock, turn_interval, sr):
+        self.script = iter(script)
+        self.clock = clock
+        self.turn_interval = turn_interval
+        self.sr = sr
+        self.turns = 0
+
+    def recognize_google(self, audio, language=None, show_all=False):
+        assert len(audio.get_raw_data()) > 0
+        self.clock.advance(self.turn_interval)
+        self.turns += 1
+        alternatives = next(self.script, [{'transcript': "goodbye", 'confidence': 0.95}])
+        if not alternatives:
+            raise self.sr.UnknownValueError()
+        return {'alternative': alternatives, 'final': True}
+
+
+class FakeSpeech:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def speak(self, text):
+        self.stats.turn_finished()
+        return True
+
+
+# ========== WORKLOAD ==========
+WORKLOAD = [  # (weight, command template)
+    (10, "open chrome"),
+    (6, "open youtube"),
+    (4, "close notepad"),
+    (10, "search python tutorials {n}"),
+    (6, "play lofi mix {n} on youtube"),
+    (8, "take screenshot"),
+    (2, "screenshot of region 0 0 640 480"),
+    (6, "volume up"),
+    (6, "what time is it"),
+    (3, "tell me a joke"),
+    (4, "remind me to stretch {n} in 5 minutes"),
+    (4, "send whatsapp to 9876543210 status update {n}"),
+    (3, "open gmail and search news {n} then take screenshot"),
+    (2, "message status"),
+    (4, "system info"),
+]
+
+
+def build_script(turns, seed=1):
+    """N-best lists for every turn, with some silent turns and misheard tops"""
+    rng = random.Random(seed)
+    weights = [w for w, _ in WORKLOAD]
+    script, previous = [], None
+    for n in range(turns):
+        if rng.random() < 0.08:
+            script.append([])
+            continue
+        command = previous
+        while command == previous:
+            command = rng.choices([c for _, c in WORKLOAD], weights)[0]
+        previous = command
+        text = command.format(n=n)
+        alternatives = [{'transcript': text, 'confidence': rng.uniform(0.8, 0.97)}]
+        if rng.random() < 0.2:
+            alternatives.insert(0, {'transcript': text.replace("open", "often"), 'confidence': 0.6})
+        script.append(alternatives)
+    return script
+
+
+# ========== MEASUREMENT ==========
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import psutil
+        return psutil.Process().memory_info().rss
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        import psutil
+        process = psutil.Process()
+        return process.num_fds() if hasattr(process, 'num_fds') else process.num_handles()
+
+
+class SoakStats:
+    def __init__(self, sample_every):
+        self.sample_every = sample_every
+        self.latencies = []
+        self.samples = []  # (turn, threads, rss, fds)
+        self._turn_started = None
+
+    def turn_started(self):
+        self._turn_started = time.perf_counter()
+
+    def turn_finished(self):
+        if self._turn_started is None:
+            return
+        self.latencies.append(time.perf_counter() - self._turn_started)
+        self._turn_started = None
+        if len(self.latencies) % self.sample_every == 0:
+            self.sample()
+
+    def sample(self):
+        self.samples.append((len(self.latencies), threading.active_count(), rss_bytes(), open_fds()))
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+        # Growth is measured after warm-up so one-time pools and caches don't count
+        first, last = self.samples[len(self.samples) // 10], self.samples[-1]
+        return {
+            'turns': len(latencies),
+            'p50_ms': round(pct(50), 2),
+            'p95_ms': round(pct(95), 2),
+            'p99_ms': round(pct(99), 2),
+            'thread_growth': last[1] - first[1],
+            'peak_threads': max(s[1] for s in self.samples),
+            'rss_growth_mb': round((last[2] - first[2]) / 1024 / 1024, 2),
+            'fd_growth': last[3] - first[3],
+        }
+
+
+def run_soak(hours=24.0, turn_interval=120.0, speedup=600.0, seed=1):
+    """Run Alfred through the scripted workload, returns the summary dict"""
+    install_desktop_fakes()
+    sys.path.insert(0, str(ROOT))
+    import app
+    import speech_recognition as sr
+
+    workdir = tempfile.mkdtemp(prefix="alfred_soak_")
+    cwd = os.getcwd()
+    shutil.copy(ROOT / app.Config.COMMANDS_FILE, workdir)
+    os.chdir(workdir)
+    try:
+        clock = AcceleratedClock(speedup)
+        app.time = clock
+        app.webbrowser.open = lambda url: True
+        app.os.system = lambda command: 0
+
+        turns = int(hours * 3600 / turn_interval)
+        stats = SoakStats(sample_every=max(turns // 50, 1))
+        random.seed(seed)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            alfred = app.Alfred()
+            alfred.speech = FakeSpeech(stats)
+            alfred.debouncer.clock = clock.monotonic
+            alfred.processor.intent_cache.clock = clock.monotonic
+            microphone = FakeMicrophone()
+            microphone.on_open = stats.turn_started
+            alfred.voice.microphone = microphone
+            alfred.voice.recognizer = FakeRecognizer(build_script(turns, seed), clock, turn_interval, sr)
+
+            stats.sample()
+            alfred.start()
+            alfred.run()
+            stats.sample()
+
+        summary = stats.summary()
+        summary['virtual_hours'] = round(hours, 2)
+        summary['microphone_opens'] = microphone.opened
+        # Numbers are only comparable between runs of the same workload
+        summary['workload'] = {'hours': hours, 'turn_interval': turn_interval,
+                               'speedup': speedup, 'seed': seed}
+        return summary
+    finally:
+        # Let in-flight sends finish before their database is deleted
+        outbox = app.AutomationEngine.outbox
+        if outbox is not None:
+            outbox.stop()
+            for worker in outbox.workers.values():
+                worker.thread.join(timeout=10)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(summary, baseline, tolerance):
+    """Regressions against the stored baseline, as readable strings"""
+    failures = []
+    for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+        limit = baseline[key] * (1 + tolerance) + 2.0
+        if summary[key] > limit:
+            failures.append(f"{key} {summary[key]} > {limit:.2f} (baseline {baseline[key]})")
+    for key, slack in (('thread_growth', 2), ('rss_growth_mb', 16), ('fd_growth', 2)):
+        limit = max(baseline[key], 0) + slack
+        if summary[key] > limit:
+            failures.append(f"{key} {summary[key]} > {limit} (baseline {baseline[key]})")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak test the full assistant loop")
+    parser.add_argument('--hours', type=float, default=24.0, help="virtual hours of use to simulate")
+    parser.add_argument('--turn-interval', type=float, default=120.0, help="virtual seconds between turns")
+    parser.add_argument('--speedup', type=float, default=600.0, help="how much faster than real time sleeps run")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed relative latency regression")
+    args = parser.parse_args()
+
+    print("="*50)
+    print(f"Soak: {args.hours}h of use, a turn every {args.turn_interval}s, {args.speedup}x speed")
+    print("="*50)
+    start = time.perf_counter()
+    summary = run_soak(args.hours, args.turn_interval, args.speedup)
+    for key, value in summary.items():
+        print(f"{key:<18} {value}")
+    print(f"(took {time.perf_counter() - start:.1f}s)")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except OSError:
+        print(f"No baseline at {args.baseline}, run with --update-baseline first")
+        sys.exit(0)
+    if baseline.get('workload') != summary['workload']:
+        print(f"Baseline {args.baseline} was recorded for workload {baseline.get('workload')}, "
+              f"not comparing. Record one for this workload with --update-baseline --baseline <file>")
+        sys.exit(0)
+
+    failures = compare(summary, baseline, args.tolerance)
+    if failures:
+        print("\n❌ Regressions against baseline:")
+        for failure in failures:
+            print(f"  • {failure}")
+        sys.exit(1)
+    print("\n✓ No regressions against baseline")